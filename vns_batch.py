@@ -0,0 +1,135 @@
+from vns_cvrp import load_instance
+from vns_experiments import run_sample, results_row, sample_key, load_samples, record_sample, RESULTS_STORE, \
+    vns_variants, k_max, max_distance, samples
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from os import listdir, cpu_count, replace
+from os.path import isfile, join
+from sys import argv
+
+
+def preload_instances(paths, storage=None):
+    '''
+    Inicializador de cada proceso del pool: lee todas las instancias una sola vez
+    para que las tareas posteriores las obtengan de la cache de load_instance
+    Con storage cada proceso solo mapea el fichero de la matriz, y las paginas se
+    comparten entre todos los procesos
+
+    Parameters
+    ----------
+        paths: list
+            Rutas de los ficheros de las instancias
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None para cargarla en memoria
+    '''
+    for path in paths:
+        load_instance(path, storage)
+
+
+def schedule_tasks(paths, functions, samples, storage=None):
+    '''
+    Genera todas las tareas (instancia, VNS, semilla) de la bateria de experimentos
+    ordenadas de mayor a menor dimension de la instancia, para que las ejecuciones
+    mas largas empiecen primero y no queden procesos parados al final
+
+    Parameters
+    ----------
+        paths: list
+            Rutas de los ficheros de las instancias
+
+        functions: list
+            Funciones VNS que se van a ejecutar
+
+        samples: int
+            Numero de veces que se va a ejecutar cada algoritmo sobre cada instancia
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None para cargarla en memoria
+
+    Returns
+    -------
+        tasks: list
+            Lista de tuplas (ruta, funcion, semilla)
+    '''
+    ordered_paths = sorted(paths, key=lambda path: load_instance(path, storage).dimension, reverse=True)
+    return [(path, function, sample) for path in ordered_paths for function in functions for sample in range(0, samples)]
+
+
+def run_batch(folder, output, functions, k_max, max_length, samples, workers, store=RESULTS_STORE, storage=None):
+    '''
+    Funcion que ejecuta todos los tipos de VNS sobre todas las instancias de una carpeta
+    en un unico pool de procesos. Cada linea de resultados se escribe en un fichero
+    temporal en cuanto terminan todas las semillas de su par (VNS, instancia), y al
+    acabar este sustituye al fichero de salida, que nunca queda a medias
+    Las ejecuciones que ya estan en el almacen de resultados no se repiten
+
+    Parameters
+    ----------
+        folder: string
+            Carpeta donde se encuentran los ficheros de las instancias
+
+        output: string
+            Fichero donde se guardan los resultados agregados
+
+        functions: list
+            Funciones VNS que se van a ejecutar
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        max_length: int
+            Distancia maxima que recorren los camiones
+
+        samples: int
+            Numero de veces que se va a ejecutar cada algoritmo sobre cada instancia
+
+        workers: int
+            Numero de procesos que ejecutan los experimentos
+
+        store: string
+            Fichero donde se guarda el resultado de cada ejecucion
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None para cargarla en memoria
+    '''
+    paths = [join(folder, f) for f in sorted(listdir(folder)) if isfile(join(folder, f))]
+    finished = load_samples(store)
+    tasks = schedule_tasks(paths, functions, samples, storage)
+    pending = [task for task in tasks if sample_key(task[1], task[0], k_max, max_length, task[2], storage) not in finished]
+    print(f'Instances: {len(paths)}, tasks: {len(tasks)}, pending: {len(pending)}, workers: {workers}, timestamp: {datetime.now().strftime("%H:%M:%S")}')
+
+    def write_if_complete(file, path, function):
+        scores = [finished.get(sample_key(function, path, k_max, max_length, sample, storage)) for sample in range(0, samples)]
+        if None not in scores:
+            filename = path.split('/')[-1]
+            print(f'Filename: {filename}, VNS: {function.__name__}, timestamp: {datetime.now().strftime("%H:%M:%S")}')
+            file.write(results_row(function, filename, scores, storage))
+            file.flush()
+
+    partial = f'{output}.tmp'
+    with open(partial, 'w') as file:
+        # Los pares que ya se completaron en una ejecucion anterior se escriben directamente
+        for path, function in {(path, function): None for path, function, sample in tasks}:
+            write_if_complete(file, path, function)
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers, initializer=preload_instances, initargs=(paths, storage)) as pool:
+                futures = {pool.submit(run_sample, function, path, k_max, max_length, sample, storage): (path, function, sample) for path, function, sample in pending}
+
+                for future in as_completed(futures):
+                    path, function, sample = futures[future]
+                    key = sample_key(function, path, k_max, max_length, sample, storage)
+                    finished[key] = future.result()
+                    record_sample(store, key, finished[key])
+                    write_if_complete(file, path, function)
+
+    replace(partial, output)
+
+
+if __name__ == '__main__':
+    # El primer argumento opcional es el numero de procesos a usar, por defecto uno por nucleo,
+    # y el segundo el tipo de la matriz de distancias mapeada en memoria (float64, float32 o nint)
+    workers = int(argv[1]) if len(argv) > 1 else cpu_count()
+    storage = argv[2] if len(argv) > 2 else None
+    run_batch('./instances', 'final_results.csv', vns_variants, k_max, max_distance, samples, workers, storage=storage)
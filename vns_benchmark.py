@@ -0,0 +1,661 @@
+import vns_cvrp
+from vns_cvrp import augerat_parser, load_instance, distance, route_length, DEPOT, Solution, Stats, build_initial_solution, \
+    shake, VND, VND_movement, MOVEMENT_DELTAS, inter_swap, inter_shift, intra_swap, intra_shift, \
+    intra_two_opt, intra_or_opt2, intra_or_opt3, inter_two_opt_star, inter_cross20, inter_cross21, inter_cross22, \
+    inter_cross30, inter_cross31, inter_cross32, inter_cross33, \
+    general_VNS_small, general_VNS_mid, general_VNS_big, CONSTRUCTORS, SCAN_ENGINES
+from random import seed, shuffle, randint
+from timeit import timeit, repeat
+from time import perf_counter
+from statistics import mean
+from contextlib import redirect_stdout
+from io import StringIO
+from copy import deepcopy
+from os.path import isfile
+from sys import argv
+import sys
+import json
+import tracemalloc
+
+# Fichero con las medidas de referencia con las que se compara benchmark_suite
+BENCHMARK_BASELINE = './results/benchmark_baseline.json'
+# Instancias, semillas y k_max fijos de los macro-benchmarks
+MACRO_INSTANCES = ['A-n32-k5.vrp', 'A-n45-k6.vrp', 'A-n60-k9.vrp', 'B-n35-k5.vrp']
+MACRO_SEEDS = [0, 1]
+MACRO_K_MAX = 20
+# Aumento relativo a partir del cual una medida se considera una regresion
+REGRESSION_TOLERANCE = 0.25
+
+
+def dict_route_length(stops, coord_map):
+    '''
+    Version original de route_length, que calcula cada distancia euclidea
+    a partir de los diccionarios de coordenadas. Se mantiene solo como
+    referencia para comparar con la matriz de distancias
+
+    Parameters
+    ----------
+        stops: list
+            Lista con las paradas que hace cada ruta
+
+        coord_map: dict
+            Diccionario con las coordenadas de cada parada
+
+    Returns
+    -------
+        length: float
+            Longitud total de la ruta
+
+    '''
+    if len(stops) == 0:
+        return 0
+
+    length = distance(coord_map[DEPOT], coord_map[stops[0]])
+
+    for i in range(0, len(stops) - 1):
+        length += distance(coord_map[stops[i]], coord_map[stops[i+1]])
+
+    length += distance(coord_map[stops[len(stops)-1]], coord_map[DEPOT])
+    return length
+
+
+def random_routes(instance, trucks, samples):
+    '''
+    Genera conjuntos de rutas aleatorias sobre una instancia
+
+    Parameters
+    ----------
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        trucks: int
+            Numero de rutas en las que se reparten las paradas
+
+        samples: int
+            Numero de conjuntos de rutas a generar
+
+    Returns
+    -------
+        routes: list
+            Lista con las listas de paradas generadas
+
+    '''
+    routes = []
+    for i in range(0, samples):
+        stops = list(range(2, instance.dimension + 1))
+        shuffle(stops)
+        routes.extend(stops[t::trucks] for t in range(0, trucks))
+
+    return routes
+
+
+def benchmark_distance(path, trucks=5, samples=200, repeat=5):
+    '''
+    Compara el calculo de longitudes de ruta con diccionarios de coordenadas
+    frente a la matriz de distancias precalculada
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        trucks: int
+            Numero de rutas en las que se reparten las paradas
+
+        samples: int
+            Numero de conjuntos de rutas aleatorias a medir
+
+        repeat: int
+            Numero de veces que se mide cada conjunto
+
+    Returns
+    -------
+        (dict_time, matrix_time): tuple
+            Tiempo en segundos de cada una de las dos implementaciones
+
+    '''
+    seed(0)
+    instance = augerat_parser(path)
+    coord_map = instance.coord_map
+    routes = random_routes(instance, trucks, samples)
+
+    for stops in routes:
+        assert abs(dict_route_length(stops, coord_map) - route_length(stops, instance)) < 1e-9
+
+    dict_time = timeit(lambda: [dict_route_length(stops, coord_map) for stops in routes], number=repeat)
+    matrix_time = timeit(lambda: [route_length(stops, instance) for stops in routes], number=repeat)
+
+    print(f'Instance: {path}, routes measured: {len(routes) * repeat}')
+    print(f'Dict path: {dict_time:.4f}s, matrix path: {matrix_time:.4f}s, speedup: {dict_time / matrix_time:.2f}x')
+    return (dict_time, matrix_time)
+
+
+def allocated_blocks(function):
+    '''
+    Mide la memoria y el numero de bloques que siguen reservados tras llamar a una funcion
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion sin argumentos a medir
+
+    Returns
+    -------
+        (size, blocks): tuple
+            Bytes y numero de bloques reservados por el resultado de la funcion
+
+    '''
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = function()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    del result
+    return (sum(stat.size_diff for stat in stats), sum(stat.count_diff for stat in stats))
+
+
+def benchmark_allocations(path, capacity=300, iterations=20):
+    '''
+    Compara las copias de rutas por iteracion de general_VNS entre la solucion
+    compartida de Solution y el deepcopy de la lista de diccionarios original
+
+    En la version original se hacia un deepcopy al entrar en shake, en cada
+    llamada a MC2 o SE_MOVEMENT y en cada llamada a VND_movement. Se cuentan esas
+    llamadas durante una serie de iteraciones y se multiplican por lo que
+    reserva cada tipo de copia
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        iterations: int
+            Numero de iteraciones de shake y VND a realizar
+
+    Returns
+    -------
+        (legacy_blocks, new_blocks): tuple
+            Bloques de memoria reservados por iteracion con cada representacion
+
+    '''
+    seed(0)
+    instance = augerat_parser(path)
+    solution = Solution(build_initial_solution(instance, capacity), instance)
+    inter_movements = [inter_swap, inter_shift]
+    intra_movements = [intra_swap, intra_shift]
+
+    counts = {'copy': 0, 'VND_movement': 0, 'neighbour': 0}
+    original_copy = Solution.copy
+    original_movement = vns_cvrp.VND_movement
+    original_neighbours = (vns_cvrp.MC2, vns_cvrp.SE_MOVEMENT)
+
+    def counted(name, function):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    Solution.copy = counted('copy', original_copy)
+    vns_cvrp.VND_movement = counted('VND_movement', original_movement)
+    vns_cvrp.MC2, vns_cvrp.SE_MOVEMENT = (counted('neighbour', function) for function in original_neighbours)
+    try:
+        tracemalloc.start()
+        peak = 0
+        for k in range(1, iterations + 1):
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            new_solution = VND(shake(solution, instance, capacity, k), instance, capacity, inter_movements, intra_movements)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+            if new_solution.score < solution.score:
+                solution = new_solution
+        tracemalloc.stop()
+    finally:
+        Solution.copy = original_copy
+        vns_cvrp.VND_movement = original_movement
+        vns_cvrp.MC2, vns_cvrp.SE_MOVEMENT = original_neighbours
+
+    routes = solution.to_routes()
+    legacy_size, legacy_blocks = allocated_blocks(lambda: deepcopy(routes))
+    new_size, new_blocks = allocated_blocks(solution.copy)
+
+    # shake hacia un deepcopy inicial, ademas del de cada vecindario y cada VND_movement
+    legacy_copies = (iterations + counts['neighbour'] + counts['VND_movement']) / iterations
+    new_copies = counts['copy'] / iterations
+
+    print(f'Instance: {path}, iterations: {iterations}, peak memory per iteration: {peak / 1024:.1f} KiB')
+    print(f'deepcopy routes: {legacy_copies:.1f} copies/iteration, {legacy_blocks} blocks and {legacy_size} bytes per copy')
+    print(f'Solution.copy:   {new_copies:.1f} copies/iteration, {new_blocks} blocks and {new_size} bytes per copy')
+    print(f'Blocks allocated per iteration: {legacy_copies * legacy_blocks:.0f} -> {new_copies * new_blocks:.0f}')
+    return (legacy_copies * legacy_blocks, new_copies * new_blocks)
+
+
+def benchmark_granular(path, k_max=20, capacity=300, samples=5, granularities=(None, 10, 5)):
+    '''
+    Compara la calidad y el tiempo de general_VNS_big con el VND completo
+    y con vecindarios granulares de distintas amplitudes
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        samples: int
+            Numero de semillas con las que se ejecuta cada configuracion
+
+        granularities: tuple
+            Numero de vecinos de cada configuracion, None para el vecindario completo
+
+    Returns
+    -------
+        results: dict
+            Puntuacion media y tiempo medio de cada configuracion
+
+    '''
+    results = {}
+    for granularity in granularities:
+        scores = []
+        start = perf_counter()
+        for sample in range(0, samples):
+            seed(sample)
+            with redirect_stdout(StringIO()):
+                scores.append(general_VNS_big(path, k_max, capacity, granularity=granularity)[0])
+        elapsed = (perf_counter() - start) / samples
+        results[granularity] = (mean(scores), elapsed)
+        name = 'full scan' if granularity is None else f'granular k={granularity}'
+        print(f'{name}: mean score {mean(scores):.2f}, best {min(scores):.2f}, {elapsed:.3f}s per run')
+
+    return results
+
+
+def benchmark_constructors(path, k_max=20, capacity=300, samples=5):
+    '''
+    Compara los metodos de construccion de la solucion inicial: el tiempo que
+    tardan, la puntuacion de la solucion inicial y la de general_VNS_big al
+    partir de ella
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        samples: int
+            Numero de semillas con las que se ejecuta cada metodo
+
+    Returns
+    -------
+        results: dict
+            Tiempo medio de construccion, puntuacion inicial media y puntuacion
+            final media de cada metodo
+
+    '''
+    instance = load_instance(path)
+    results = {}
+    for name, constructor in CONSTRUCTORS.items():
+        elapsed, initial, final = [], [], []
+        for sample in range(0, samples):
+            seed(sample)
+            with redirect_stdout(StringIO()):
+                start = perf_counter()
+                routes = constructor(instance, capacity)
+                elapsed.append(perf_counter() - start)
+                initial.append(Solution(routes, instance).score)
+                seed(sample)
+                final.append(general_VNS_big(path, k_max, capacity, constructor=name)[0])
+        results[name] = (mean(elapsed), mean(initial), mean(final))
+        print(f'{name}: {mean(elapsed) * 1000:.2f}ms to build, initial score {mean(initial):.2f}, mean final score {mean(final):.2f}')
+
+    return results
+
+
+def benchmark_engines(path, k_max=20, capacity=300, samples=5):
+    '''
+    Compara el tiempo de general_VNS_big con cada motor del VND y comprueba que
+    con la misma semilla todos obtienen la misma solucion que el motor 'python'
+    Antes de medir se hace una ejecucion de calentamiento, para que el tiempo de
+    compilacion del motor 'jit' no cuente. Sin Numba, 'jit' recorre los vecindarios
+    en Python
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        samples: int
+            Numero de semillas con las que se ejecuta cada motor
+
+    Returns
+    -------
+        results: dict
+            Tiempo medio por ejecucion de cada motor y si sus soluciones coinciden
+            con las del motor 'python'
+
+    '''
+    print(f"Numba {'available' if vns_cvrp.njit is not None else 'not installed'}")
+    results = {}
+    reference = None
+    for engine in SCAN_ENGINES:
+        solutions = []
+        with redirect_stdout(StringIO()):
+            general_VNS_big(path, 2, capacity, engine=engine)
+            start = perf_counter()
+            for sample in range(0, samples):
+                seed(sample)
+                solutions.append(general_VNS_big(path, k_max, capacity, engine=engine))
+        elapsed = (perf_counter() - start) / samples
+        if reference is None:
+            reference = (solutions, elapsed)
+        identical = solutions == reference[0]
+        results[engine] = (elapsed, identical)
+        print(f"{engine}: {elapsed:.3f}s per run, {reference[1] / elapsed:.2f}x speedup, "
+              f"{'same' if identical else 'DIFFERENT'} solutions")
+
+    return results
+
+
+def time_calls(function, arguments, rounds=5):
+    '''
+    Mide el tiempo por llamada de una funcion sobre una lista de argumentos,
+    quedandose con la mejor de varias rondas para reducir el ruido
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion a medir
+
+        arguments: list
+            Tuplas de argumentos con las que se llama a la funcion
+
+        rounds: int
+            Numero de veces que se recorre la lista de argumentos
+
+    Returns
+    -------
+        seconds: float
+            Segundos por llamada de la mejor ronda
+    '''
+    best = min(repeat(lambda: [function(*args) for args in arguments], number=1, repeat=rounds))
+    return best / len(arguments)
+
+
+def micro_benchmarks(path='./instances/A-n80-k10.vrp', capacity=300, samples=2000):
+    '''
+    Mide el tiempo por llamada de las operaciones basicas del VNS sobre
+    argumentos aleatorios generados con una semilla fija
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        samples: int
+            Numero de llamadas distintas a cada operacion
+
+    Returns
+    -------
+        results: dict
+            Para cada operacion, segundos por llamada y evaluaciones por segundo
+            si la operacion recorre vecindarios
+    '''
+    seed(0)
+    instance = load_instance(path)
+    coord_map = instance.coord_map
+    solution = Solution(build_initial_solution(instance, capacity), instance)
+    routes = [stops for stops in solution.stops if len(stops) > 1]
+    nodes = list(coord_map)
+    results = {}
+
+    pairs = [(coord_map[nodes[randint(0, len(nodes) - 1)]], coord_map[nodes[randint(0, len(nodes) - 1)]]) for i in range(0, samples)]
+    results['distance'] = {'seconds': time_calls(distance, pairs)}
+    results['route_length'] = {'seconds': time_calls(route_length, [(routes[i % len(routes)], instance) for i in range(0, samples)])}
+
+    # Los movimientos de tramos usan rutas e indices en los que caben tramos de hasta 3 paradas
+    segment_routes = [stops for stops in routes if len(stops) > 3]
+    intra_arguments = []
+    inter_arguments = []
+    segment_arguments = []
+    cross_arguments = []
+    for i in range(0, samples):
+        route = routes[randint(0, len(routes) - 1)]
+        first, second = randint(0, len(route) - 1), randint(0, len(route) - 1)
+        while first == second:
+            second = randint(0, len(route) - 1)
+        intra_arguments.append((route, first, second))
+        origin, dest = randint(0, len(routes) - 1), randint(0, len(routes) - 1)
+        while origin == dest:
+            dest = randint(0, len(routes) - 1)
+        inter_arguments.append((routes[origin], routes[dest], randint(0, len(routes[origin]) - 1), randint(0, len(routes[dest]) - 1)))
+
+        route = segment_routes[randint(0, len(segment_routes) - 1)]
+        first, second = randint(0, len(route) - 3), randint(0, len(route) - 3)
+        while first == second:
+            second = randint(0, len(route) - 3)
+        segment_arguments.append((route, first, second))
+        origin, dest = randint(0, len(segment_routes) - 1), randint(0, len(segment_routes) - 1)
+        while origin == dest:
+            dest = randint(0, len(segment_routes) - 1)
+        cross_arguments.append((segment_routes[origin], segment_routes[dest], randint(0, len(segment_routes[origin]) - 3), randint(0, len(segment_routes[dest]) - 3)))
+
+    movement_arguments = [((intra_swap, intra_shift, intra_two_opt), intra_arguments),
+                          ((intra_or_opt2, intra_or_opt3), segment_arguments),
+                          ((inter_swap, inter_shift, inter_two_opt_star), inter_arguments),
+                          ((inter_cross20, inter_cross21, inter_cross22, inter_cross30, inter_cross31, inter_cross32, inter_cross33), cross_arguments)]
+    for movements, arguments in movement_arguments:
+        for movement in movements:
+            results[movement.__name__] = {'seconds': time_calls(movement, arguments)}
+            results[f'{movement.__name__}_delta'] = {'seconds': time_calls(MOVEMENT_DELTAS[movement], [args + (instance,) for args in arguments])}
+
+    shake_arguments = [(solution, instance, capacity, k) for k in range(1, 11)] * 20
+    results['shake'] = {'seconds': time_calls(shake, shake_arguments)}
+
+    # Cada llamada a VND_movement parte de una solucion agitada distinta
+    starts = [shake(solution, instance, capacity, randint(1, 10)) for i in range(0, 50)]
+    def descent_steps(stats=None):
+        seed(1)
+        for start in starts:
+            VND_movement(start.copy(), instance, capacity, [inter_swap, inter_shift], [intra_swap, intra_shift], stats=stats)
+
+    stats = Stats()
+    descent_steps(stats)
+    evaluations = sum(counters[0] for counters in stats.operators.values())
+    seconds = min(repeat(descent_steps, number=1, repeat=5)) / len(starts)
+    results['VND_movement'] = {'seconds': seconds, 'evaluations_per_second': evaluations / len(starts) / seconds}
+
+    return results
+
+
+def macro_benchmarks(folder='./instances', capacity=300, rounds=3):
+    '''
+    Ejecuta las tres variantes de general_VNS sobre las instancias y semillas fijas
+    de MACRO_INSTANCES y MACRO_SEEDS, midiendo el tiempo, las evaluaciones por
+    segundo y la memoria maxima reservada
+
+    Parameters
+    ----------
+        folder: string
+            Carpeta donde se encuentran los ficheros de las instancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        rounds: int
+            Numero de veces que se ejecuta cada semilla, quedandose con el menor tiempo
+
+    Returns
+    -------
+        results: dict
+            Para cada par (variante, instancia), segundos por ejecucion, evaluaciones
+            por segundo, KiB de memoria maxima y puntuaciones de cada semilla
+    '''
+    results = {}
+    for function in (general_VNS_small, general_VNS_mid, general_VNS_big):
+        for filename in MACRO_INSTANCES:
+            path = f'{folder}/{filename}'
+            load_instance(path)
+            scores = []
+            evaluations = 0
+            elapsed = 0
+            for sample in MACRO_SEEDS:
+                times = []
+                for i in range(0, rounds):
+                    stats = Stats()
+                    seed(sample)
+                    start = perf_counter()
+                    with redirect_stdout(StringIO()):
+                        score = function(path, MACRO_K_MAX, capacity, stats=stats)[0]
+                    times.append(perf_counter() - start)
+                scores.append(score)
+                elapsed += min(times)
+                evaluations += sum(counters[0] for counters in stats.operators.values())
+
+            # La memoria se mide aparte porque tracemalloc ralentiza la ejecucion
+            seed(MACRO_SEEDS[0])
+            tracemalloc.start()
+            with redirect_stdout(StringIO()):
+                function(path, MACRO_K_MAX, capacity)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[f'{function.__name__}/{filename}'] = {'seconds': elapsed / len(MACRO_SEEDS), 'evaluations_per_second': evaluations / elapsed,
+                                                          'peak_kib': peak / 1024, 'scores': scores}
+    return results
+
+
+def compare_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    '''
+    Compara unas medidas con las de referencia y devuelve las regresiones: tiempos o
+    memoria que aumentan mas de la tolerancia, evaluaciones por segundo que bajan mas
+    de la tolerancia y puntuaciones distintas con las mismas semillas
+
+    Parameters
+    ----------
+        results: dict
+            Medidas actuales, indexadas por nombre del benchmark
+
+        baseline: dict
+            Medidas de referencia con el mismo formato
+
+        tolerance: float
+            Variacion relativa permitida
+
+    Returns
+    -------
+        regressions: list
+            Descripcion de cada regresion encontrada
+    '''
+    regressions = []
+    for name, measures in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric in ('seconds', 'peak_kib'):
+            if metric in measures and metric in reference and measures[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(f'{name}: {metric} {reference[metric]:.6g} -> {measures[metric]:.6g}')
+        if 'evaluations_per_second' in reference and measures['evaluations_per_second'] < reference['evaluations_per_second'] * (1 - tolerance):
+            regressions.append(f'{name}: evaluations_per_second {reference["evaluations_per_second"]:.6g} -> {measures["evaluations_per_second"]:.6g}')
+        if 'scores' in reference and measures['scores'] != reference['scores']:
+            regressions.append(f'{name}: scores {reference["scores"]} -> {measures["scores"]}')
+
+    return regressions
+
+
+def benchmark_suite(baseline=BENCHMARK_BASELINE, update=False, tolerance=REGRESSION_TOLERANCE):
+    '''
+    Ejecuta los micro-benchmarks y los macro-benchmarks y los compara con las medidas
+    de referencia guardadas. Si no hay medidas de referencia, o se pide actualizarlas,
+    se guardan las actuales. Las medidas que no estan en la referencia se anaden a ella
+
+    Parameters
+    ----------
+        baseline: string
+            Fichero JSON con las medidas de referencia
+
+        update: boolean
+            Si es True, sustituye las medidas de referencia por las actuales
+
+        tolerance: float
+            Variacion relativa permitida antes de marcar una regresion
+
+    Returns
+    -------
+        regressions: list
+            Descripcion de cada regresion respecto a las medidas de referencia
+    '''
+    results = {'micro': micro_benchmarks(), 'macro': macro_benchmarks()}
+
+    for name, measures in results['micro'].items():
+        throughput = f', {measures["evaluations_per_second"]:.0f} evaluations/s' if 'evaluations_per_second' in measures else ''
+        print(f'{name}: {measures["seconds"] * 1e6:.2f} us/call{throughput}')
+    for name, measures in results['macro'].items():
+        print(f'{name}: {measures["seconds"]:.3f}s/run, {measures["evaluations_per_second"]:.0f} evaluations/s, '
+              f'peak {measures["peak_kib"]:.0f} KiB, scores {measures["scores"]}')
+
+    if update or not isfile(baseline):
+        with open(baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f'Baseline written to {baseline}')
+        return []
+
+    with open(baseline) as file:
+        reference = json.load(file)
+    regressions = compare_baseline(results['micro'], reference['micro'], tolerance) + compare_baseline(results['macro'], reference['macro'], tolerance)
+
+    # Las medidas que aun no tienen referencia, como las de movimientos nuevos, se anaden a ella
+    missing = {group: {name: measures for name, measures in results[group].items() if name not in reference[group]} for group in results}
+    if any(missing.values()):
+        for group in results:
+            reference[group].update(missing[group])
+        with open(baseline, 'w') as file:
+            json.dump(reference, file, indent=2)
+        print(f'Added {", ".join(name for group in missing.values() for name in group)} to {baseline}')
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if not regressions:
+        print(f'No regressions against {baseline}')
+
+    return regressions
+
+
+BENCHMARKS = {
+    'distance': benchmark_distance,
+    'allocations': benchmark_allocations,
+    'granular': benchmark_granular,
+    'constructors': benchmark_constructors,
+    'engines': benchmark_engines,
+}
+
+if __name__ == '__main__':
+    benchmark = argv[1] if len(argv) > 1 else 'distance'
+    if benchmark == 'suite':
+        # Con update se guardan las medidas actuales como referencia, con un numero
+        # se comparan con la referencia usando esa tolerancia
+        update = len(argv) > 2 and argv[2] == 'update'
+        tolerance = float(argv[2]) if len(argv) > 2 and not update else REGRESSION_TOLERANCE
+        regressions = benchmark_suite(update=update, tolerance=tolerance)
+        sys.exit(1 if regressions else 0)
+    path = argv[2] if len(argv) > 2 else './instances/A-n80-k10.vrp'
+    BENCHMARKS[benchmark](path)
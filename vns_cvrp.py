@@ -1,9 +1,25 @@
 from random import shuffle, randint
 from math import sqrt, pow, inf
 from itertools import permutations, product
-from copy import deepcopy
+from functools import lru_cache
+from heapq import heappush, heappop
+from time import perf_counter
+from hashlib import sha1
+from os import makedirs, replace, getpid
+from os.path import isfile, join
+import json
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 MAX_ATTEMPTS = 50
+DEPOT = 1
+# Margen para no aceptar como mejoras diferencias debidas al redondeo
+IMPROVEMENT_EPSILON = 1e-9
 
 def distance(origin, dest):
     '''
@@ -26,7 +42,7 @@ def distance(origin, dest):
     return sqrt(pow((origin['x'] - dest['x']), 2) + pow((origin['y'] - dest['y']), 2))
 
 
-def route_length(stops, coord_map):
+def route_length(stops, instance):
     '''
     Funcion para calcular la longitud de una ruta
     Tiene en cuenta la salida del punto de partida y el retorno
@@ -37,8 +53,8 @@ def route_length(stops, coord_map):
         stops: list
             Lista con las paradas que hace cada ruta
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
     Returns
     -------
@@ -48,16 +64,40 @@ def route_length(stops, coord_map):
     '''
     if len(stops) == 0:
         return 0
-    
-    length = distance(coord_map[1], coord_map[stops[0]])
 
-    for i in range(0, len(stops) - 1):
-        length += distance(coord_map[stops[i]], coord_map[stops[i+1]])
-    
-    length += distance(coord_map[stops[len(stops)-1]], coord_map[1])
+    dist = instance.distances
+    previous = DEPOT
+    length = 0
+    for stop in stops:
+        length += dist[previous][stop]
+        previous = stop
+
+    length += dist[previous][DEPOT]
     return length
 
-def validate_route(route, capacity, coord_map):
+def route_load(stops, instance):
+    '''
+    Funcion para calcular la carga de una ruta, es decir, la suma de
+    las demandas de sus paradas
+
+    Parameters
+    ----------
+        stops: list
+            Lista con las paradas que hace cada ruta
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    Returns
+    -------
+        load: int
+            Demanda total de las paradas de la ruta
+
+    '''
+    demands = instance.stop_demands
+    return sum(demands[stop] for stop in stops)
+
+def validate_route(route, capacity, instance, load_capacity=None):
     '''
     Funcion para validar una ruta
 
@@ -69,23 +109,248 @@ def validate_route(route, capacity, coord_map):
         capacity: int
             Distancia maxima que puede recorrer un camion
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        load_capacity: int
+            Carga maxima de un camion, o None si no se tienen en cuenta las demandas
 
     Returns
     -------
         valid: boolean
             Validez de la ruta, es decir, si la longitud de la ruta
             es menor que la distancia maxima que puede recorrer 
-            un camion
+            un camion y, si se indica, su carga no supera la del camion
 
     '''
-    length = route_length(route, coord_map)
+    length = route_length(route, instance)
+    if load_capacity is not None and route_load(route, instance) > load_capacity:
+        return False
     return length < capacity
 
-def augerat_parser(path): 
+class Instance:
+    '''
+    Instancia del problema CVRP con las distancias entre paradas precalculadas
+    Los arrays se indexan directamente con el identificador de cada parada, por
+    lo que la posicion 0 no se usa
+
+    Attributes
+    ----------
+        header: dict
+            Campos de la cabecera del fichero, como NAME, DIMENSION, CAPACITY o EDGE_WEIGHT_TYPE
+
+        coords: numpy.ndarray
+            Array de (n+1)x2 elementos con las coordenadas de cada parada
+
+        demands: numpy.ndarray
+            Array de n+1 elementos con la demanda de cada parada
+
+        stop_demands: list
+            Lista con los mismos valores que demands, mas rapida de consultar
+            elemento a elemento desde Python
+
+        vehicle_capacity: int
+            Carga maxima de cada camion segun el campo CAPACITY de la cabecera,
+            o None si el fichero no lo indica
+
+        dimension: int
+            Numero de paradas de la instancia, incluyendo el deposito
+
+        matrix: numpy.ndarray
+            Matriz densa con la distancia entre cada par de paradas
+
+        distances: list
+            Lista de listas con los mismos valores que matrix, mas rapida
+            de consultar elemento a elemento desde Python. Si la matriz esta
+            mapeada en memoria es un MappedDistances, que solo convierte las
+            filas que se consultan
+
+        neighbour_lists: dict
+            Listas de vecinos mas cercanos ya calculadas, indexadas por el numero de vecinos
+
+        route_prefix: funcion
+            Devuelve las sumas acumuladas (RoutePrefix) de una lista de paradas. Guarda las
+            de las ultimas listas consultadas, que nunca se modifican, por identidad
+
+    '''
+    def __init__(self, coords, demands, header, matrix=None):
+        self.header = header
+        self.coords = coords
+        self.demands = demands
+        self.stop_demands = demands.tolist()
+        self.vehicle_capacity = header.get('CAPACITY')
+        self.dimension = len(coords) - 1
+        self.matrix = distance_matrix(coords, header.get('EDGE_WEIGHT_TYPE', 'EUC_2D')) if matrix is None else matrix
+        self.distances = MappedDistances(self.matrix) if isinstance(self.matrix, np.memmap) else self.matrix.tolist()
+        self.neighbour_lists = {}
+        self.route_prefix = PrefixCache(self)
+
+    @property
+    def coord_map(self):
+        '''
+        Diccionario con las coordenadas de cada parada, en el formato del parser original
+
+        Returns
+        -------
+            coord_map: dict
+                Diccionario {parada: {'x': x, 'y': y}}
+        '''
+        return {node: {'x': self.coords[node][0], 'y': self.coords[node][1]} for node in range(1, self.dimension + 1)}
+
+    def nearest_neighbours(self, k):
+        '''
+        Devuelve, para cada parada, las k paradas mas cercanas sin contar el deposito
+        Se calculan la primera vez que se piden para cada k
+
+        Parameters
+        ----------
+            k: int
+                Numero de vecinos de cada parada
+
+        Returns
+        -------
+            neighbours: list
+                Lista indexada por el identificador de la parada con la lista
+                de sus vecinos, ordenados de mas cercano a mas lejano
+        '''
+        if k not in self.neighbour_lists:
+            customers = np.arange(DEPOT + 1, self.dimension + 1)
+            customer_distances = self.matrix[np.ix_(customers, customers)]
+            np.fill_diagonal(customer_distances, np.inf)
+            order = np.argsort(customer_distances, axis=1, kind='stable')[:, :k]
+
+            neighbours = [[] for i in range(0, DEPOT + 1)]
+            neighbours.extend(customers[row].tolist() for row in order)
+            self.neighbour_lists[k] = neighbours
+
+        return self.neighbour_lists[k]
+
+
+class MappedDistances:
+    '''
+    Acceso fila a fila a una matriz de distancias mapeada en memoria con el mismo
+    formato que la lista de listas de Instance.distances. Las filas consultadas se
+    convierten a listas de floats de Python, de modo que las sumas se hacen con la
+    misma precision que con la matriz en memoria, y solo se guardan las ultimas
+
+    Attributes
+    ----------
+        matrix: numpy.memmap
+            Matriz de distancias mapeada en memoria
+
+        row: funcion
+            Devuelve una fila de la matriz como lista, guardando las mas recientes
+    '''
+    __slots__ = ('matrix', 'row')
+
+    def __init__(self, matrix, rows=256):
+        '''
+        Parameters
+        ----------
+            matrix: numpy.memmap
+                Matriz de distancias mapeada en memoria
+
+            rows: int
+                Numero maximo de filas convertidas que se guardan
+        '''
+        self.matrix = matrix
+        self.row = lru_cache(maxsize=rows)(lambda index: matrix[index].tolist())
+
+    def __getitem__(self, index):
+        return self.row(index)
+
+    def __len__(self):
+        return len(self.matrix)
+
+
+# Tipos con los que se puede guardar la matriz de distancias mapeada en memoria
+# 'nint' redondea cada distancia al entero mas cercano, como indica TSPLIB para EUC_2D
+MATRIX_STORAGES = {
+    'float64': np.float64,
+    'float32': np.float32,
+    'nint': np.int32,
+}
+
+def distance_matrix(coords, edge_weight_type='EUC_2D', start=0, stop=None):
+    '''
+    Funcion para calcular la matriz de distancias entre todas las paradas, o solo
+    algunas de sus filas
+    Con EUC_2D se usa la distancia euclidea sin redondear, como en el resto del
+    codigo, y con CEIL_2D se redondea hacia arriba
+
+    Parameters
+    ----------
+        coords: numpy.ndarray
+            Array de (n+1)x2 elementos con las coordenadas de cada parada
+
+        edge_weight_type: string
+            Tipo de distancia de la cabecera del fichero
+
+        start: int
+            Primera fila a calcular
+
+        stop: int
+            Fila siguiente a la ultima a calcular, o None para llegar al final
+
+    Returns
+    -------
+        matrix: numpy.ndarray
+            Matriz de (n+1)x(n+1) elementos indexada por el identificador de la parada,
+            o las filas pedidas de esa matriz
+
+    '''
+    if edge_weight_type not in ('EUC_2D', 'CEIL_2D'):
+        raise ValueError(f'EDGE_WEIGHT_TYPE {edge_weight_type} is not supported')
+
+    x = coords[:, 0]
+    y = coords[:, 1]
+    dx = x[start:stop, np.newaxis] - x[np.newaxis, :]
+    dy = y[start:stop, np.newaxis] - y[np.newaxis, :]
+    matrix = np.sqrt(dx * dx + dy * dy)
+    return np.ceil(matrix) if edge_weight_type == 'CEIL_2D' else matrix
+
+
+def write_distance_matrix(coords, edge_weight_type, path, storage, block=1024):
+    '''
+    Funcion para guardar la matriz de distancias en un fichero .npy que se pueda
+    mapear en memoria. Se calcula por bloques de filas para no tener nunca la
+    matriz completa en memoria
+
+    Parameters
+    ----------
+        coords: numpy.ndarray
+            Array de (n+1)x2 elementos con las coordenadas de cada parada
+
+        edge_weight_type: string
+            Tipo de distancia de la cabecera del fichero
+
+        path: string
+            Fichero donde se guarda la matriz
+
+        storage: string
+            Tipo con el que se guardan las distancias, una clave de MATRIX_STORAGES
+
+        block: int
+            Numero de filas que se calculan a la vez
+    '''
+    size = len(coords)
+    # Se escribe en un fichero temporal para que otro proceso nunca mapee un fichero a medias
+    temporary = f'{path}.{getpid()}.tmp'
+    matrix = np.lib.format.open_memmap(temporary, mode='w+', dtype=MATRIX_STORAGES[storage], shape=(size, size))
+    for start in range(0, size, block):
+        rows = distance_matrix(coords, edge_weight_type, start, start + block)
+        matrix[start:start + block] = np.floor(rows + 0.5) if storage == 'nint' else rows
+
+    matrix.flush()
+    del matrix
+    replace(temporary, path)
+
+
+def read_cvrplib(path):
     '''
-    Funcion para leer los ficheros de las instancias Augerat
+    Funcion para leer los ficheros de las instancias en formato TSPLIB/CVRPLIB
+    El fichero se lee linea a linea y los campos se separan por cualquier espacio
+    en blanco. Se leen la cabecera, NODE_COORD_SECTION, DEMAND_SECTION y DEPOT_SECTION
 
     Parameters
     ----------
@@ -94,24 +359,158 @@ def augerat_parser(path):
 
     Returns
     -------
-        coord_map: dict
-            Diccionario con las paradas y sus coordenadas en el plano
-            La primera parada es el deposito de donde parten y a donde
-            llegan todos los camiones
+        (coords, demands, header): tuple
+            Coordenadas y demandas de cada parada, indexadas por su identificador,
+            y diccionario con los campos de la cabecera
     '''
+    header = {}
+    coords = None
+    demands = None
+    depots = []
+    section = None
+
     with open(path) as file:
-        coord_map = {}
-        flag = False
-        for line in file.readlines(): 
-            if 'DEMAND_SECTION' in line:
-                return coord_map
-            if flag:
-                node = line.split(' ')
-                coord_map[int(node[1])] = {'x': int(node[2]), 'y': int(node[3][:-1])}
-            if 'NODE_COORD_SECTION' in line: 
-                flag = True
-
-def routes_score(routes, coord_map):
+        for line in file:
+            fields = line.split()
+            if not fields:
+                continue
+
+            if fields[0] == 'EOF':
+                break
+            if fields[0].endswith('_SECTION'):
+                section = fields[0]
+                if coords is None:
+                    coords = np.zeros((header['DIMENSION'] + 1, 2))
+                    demands = np.zeros(header['DIMENSION'] + 1, dtype=int)
+                continue
+
+            if section is None:
+                # Linea de cabecera "CLAVE : valor", con o sin espacios alrededor de los dos puntos
+                key, separator, value = line.partition(':')
+                value = value.strip()
+                header[key.strip()] = int(value) if value.lstrip('-').isdigit() else value
+            elif section == 'NODE_COORD_SECTION':
+                coords[int(fields[0])] = (float(fields[1]), float(fields[2]))
+            elif section == 'DEMAND_SECTION':
+                demands[int(fields[0])] = int(fields[1])
+            elif section == 'DEPOT_SECTION':
+                if int(fields[0]) == -1:
+                    section = None
+                else:
+                    depots.append(int(fields[0]))
+
+    if depots and depots != [DEPOT]:
+        raise ValueError(f'Only instances with a single depot at node {DEPOT} are supported')
+
+    return (coords, demands, header)
+
+
+def augerat_parser(path):
+    '''
+    Funcion para leer los ficheros de las instancias Augerat, o cualquier otra
+    en formato TSPLIB/CVRPLIB
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero a leer
+
+    Returns
+    -------
+        instance: Instance
+            Instancia con las paradas, sus coordenadas en el plano, sus demandas y
+            la matriz de distancias. La primera parada es el deposito de donde parten
+            y a donde llegan todos los camiones
+    '''
+    return Instance(*read_cvrplib(path))
+
+
+# Carpeta donde se guarda la version binaria de cada instancia leida
+INSTANCE_CACHE = './.instance_cache'
+# Se incrementa cuando cambia el contenido de la cache para no leer ficheros antiguos
+CACHE_VERSION = 2
+
+def cached_instance(path, cache=INSTANCE_CACHE, storage=None):
+    '''
+    Funcion para obtener una instancia de la cache binaria, o leerla y guardarla en
+    la cache si no esta. Cada fichero de la cache se identifica por el hash del
+    fichero de la instancia, por lo que si este cambia se vuelve a leer
+    La cabecera, las coordenadas y las demandas se guardan en un .npz y la matriz de
+    distancias en un .npy por cada tipo con el que se guarda
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero a leer
+
+        cache: string
+            Carpeta de la cache, o None para leer siempre el fichero
+
+        storage: string
+            Si es None la matriz se carga entera en memoria como float64. Si es una
+            clave de MATRIX_STORAGES se mapea en memoria con ese tipo, de modo que
+            todos los procesos que usan la instancia comparten las mismas paginas
+
+    Returns
+    -------
+        instance: Instance
+            Instancia con las paradas y la matriz de distancias
+    '''
+    if cache is None:
+        if storage is not None:
+            raise ValueError('Memory-mapped distance matrices need a cache folder')
+        return augerat_parser(path)
+    if storage is not None and storage not in MATRIX_STORAGES:
+        raise ValueError(f'Distance matrix storage {storage} is not supported')
+
+    with open(path, 'rb') as file:
+        digest = sha1(file.read()).hexdigest()
+    cache_path = join(cache, f'{digest}-v{CACHE_VERSION}')
+    makedirs(cache, exist_ok=True)
+
+    if isfile(f'{cache_path}.npz'):
+        with np.load(f'{cache_path}.npz') as data:
+            coords, demands, header = data['coords'], data['demands'], json.loads(str(data['header']))
+    else:
+        coords, demands, header = read_cvrplib(path)
+        # Se escribe en un fichero temporal para que otro proceso nunca lea un fichero a medias
+        temporary = f'{cache_path}.{getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(file, coords=coords, demands=demands, header=json.dumps(header))
+        replace(temporary, f'{cache_path}.npz')
+
+    matrix_path = f'{cache_path}-{storage or "float64"}.npy'
+    if not isfile(matrix_path):
+        write_distance_matrix(coords, header.get('EDGE_WEIGHT_TYPE', 'EUC_2D'), matrix_path, storage or 'float64')
+
+    matrix = np.load(matrix_path, mmap_mode=None if storage is None else 'r')
+    return Instance(coords, demands, header, matrix)
+
+@lru_cache(maxsize=None)
+def load_instance(path, storage=None):
+    '''
+    Funcion para obtener una instancia leyendola solo la primera vez
+    Las siguientes llamadas con la misma ruta dentro del mismo proceso
+    devuelven la instancia ya construida, y las de otros procesos o ejecuciones
+    la leen de la cache binaria sin volver a procesar el fichero
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero a leer
+
+        storage: string
+            None para tener la matriz de distancias en memoria, o 'float64', 'float32'
+            o 'nint' para mapearla en memoria con ese tipo
+
+    Returns
+    -------
+        instance: Instance
+            Instancia con las paradas y la matriz de distancias
+    '''
+    return cached_instance(path, storage=storage)
+
+def routes_score(routes, instance):
     '''
     Funcion para calcular la puntuacion de todas las rutas
 
@@ -120,8 +519,8 @@ def routes_score(routes, coord_map):
         routes: dict
             Diccionario con las rutas que hace cada camion, y el camion que las realiza
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
     Returns
     -------
@@ -131,10 +530,492 @@ def routes_score(routes, coord_map):
     '''
     score = 0
     for route in routes:
-        score += route_length(route['stops'], coord_map)
+        score += route_length(route['stops'], instance)
     
     return score
 
+class PrefixCache:
+    '''
+    Sumas acumuladas de las ultimas listas de paradas consultadas, indexadas por
+    la identidad de la lista. Como las listas de paradas nunca se modifican, las
+    sumas siguen siendo validas mientras la lista exista; se guarda la lista junto
+    a ellas para que su identidad no pueda reutilizarse
+
+    Attributes
+    ----------
+        instance: Instance
+            Instancia del problema con la matriz de distancias y las demandas
+
+        prefixes: dict
+            Tuplas (lista de paradas, RoutePrefix) indexadas por id de la lista
+
+        size: int
+            Numero maximo de listas guardadas
+    '''
+    __slots__ = ('instance', 'prefixes', 'size')
+
+    def __init__(self, instance, size=1024):
+        self.instance = instance
+        self.prefixes = {}
+        self.size = size
+
+    def __call__(self, stops):
+        entry = self.prefixes.get(id(stops))
+        if entry is not None and entry[0] is stops:
+            return entry[1]
+        if len(self.prefixes) >= self.size:
+            self.prefixes.clear()
+        prefix = RoutePrefix(stops, self.instance)
+        self.prefixes[id(stops)] = (stops, prefix)
+        return prefix
+
+
+class RoutePrefix:
+    '''
+    Sumas acumuladas de una ruta, con las que la longitud y la carga de cualquier
+    tramo de la ruta se obtienen con una resta en lugar de recorrerlo
+    Como las listas de paradas nunca se modifican, se calculan una sola vez por ruta
+
+    Attributes
+    ----------
+        nodes: list
+            Paradas de la ruta con el deposito al principio y al final, de modo que
+            la parada i de la ruta esta en la posicion i+1
+
+        lengths: list
+            Distancia recorrida desde el deposito hasta cada posicion de nodes
+
+        loads: list
+            Demanda de las primeras i paradas de la ruta en la posicion i
+    '''
+    __slots__ = ('nodes', 'lengths', 'loads')
+
+    def __init__(self, stops, instance):
+        dist = instance.distances
+        demands = instance.stop_demands
+        self.nodes = [DEPOT] + stops + [DEPOT]
+        self.lengths = [0]
+        self.loads = [0]
+        for previous, stop in zip(self.nodes, self.nodes[1:]):
+            self.lengths.append(self.lengths[-1] + dist[previous][stop])
+        for stop in stops:
+            self.loads.append(self.loads[-1] + demands[stop])
+
+    def segment_length(self, start, stop):
+        '''
+        Longitud del tramo entre las paradas start y stop-1 de la ruta, sin contar
+        las aristas que lo unen al resto. Como las distancias son simetricas, es la
+        misma que la del tramo recorrido al reves
+
+        Parameters
+        ----------
+            start: int
+                Indice de la primera parada del tramo
+
+            stop: int
+                Indice siguiente a la ultima parada del tramo
+
+        Returns
+        -------
+            length: float
+                Longitud del tramo, 0 si esta vacio
+        '''
+        if stop <= start:
+            return 0
+        return self.lengths[stop] - self.lengths[start + 1]
+
+    def segment_load(self, start, stop):
+        '''
+        Demanda de las paradas entre start y stop-1 de la ruta
+
+        Parameters
+        ----------
+            start: int
+                Indice de la primera parada del tramo
+
+            stop: int
+                Indice siguiente a la ultima parada del tramo
+
+        Returns
+        -------
+            load: int
+                Demanda total del tramo
+        '''
+        return self.loads[stop] - self.loads[start]
+
+
+class Solution:
+    '''
+    Rutas de una solucion junto con la longitud de cada una y la puntuacion total
+    Las longitudes se actualizan de forma incremental al aplicar cada movimiento,
+    de modo que no hace falta volver a medir las rutas que no cambian
+
+    Las listas de paradas nunca se modifican: cada movimiento sustituye la
+    lista de la ruta que cambia por una nueva. Gracias a ello, copiar una
+    solucion solo duplica las listas exteriores y comparte las paradas con
+    el original, en lugar de copiar todas las rutas con deepcopy
+
+    Attributes
+    ----------
+        trucks: list
+            Camion que realiza cada ruta
+
+        stops: list
+            Lista con las paradas de cada ruta
+
+        lengths: list
+            Longitud de cada ruta, en el mismo orden que stops
+
+        loads: list
+            Carga de cada ruta, en el mismo orden que stops. Se actualiza de forma
+            incremental igual que las longitudes, tambien si load_capacity es None,
+            aunque entonces no se consulta
+
+        load_capacity: int
+            Carga maxima de cada ruta, o None si no se tienen en cuenta las demandas
+
+        score: float
+            Suma de las longitudes de todas las rutas
+
+        exhausted: dict
+            Unidades de busqueda del VND (movimiento, indices de las rutas) en las
+            que no hay ningun movimiento que mejore, junto con las rutas que tenian
+            entonces. Mientras esas rutas no cambien, el VND no las vuelve a recorrer.
+            Se comparte entre copias y solo se duplica al anotar una unidad
+
+        exhausted_shared: boolean
+            Si es True, exhausted puede estar compartido con otra copia de la solucion
+
+        looking: set
+            Paradas cuyo bit "don't look" esta desactivado, es decir, desde las que
+            el VND prueba movimientos entre rutas. None si no se usan estos bits
+
+    '''
+    __slots__ = ('trucks', 'stops', 'lengths', 'loads', 'load_capacity', 'score', 'exhausted', 'exhausted_shared', 'looking')
+
+    def __init__(self, routes, instance, load_capacity=None):
+        self.trucks = [route['truck'] for route in routes]
+        self.stops = [route['stops'] for route in routes]
+        self.lengths = [route_length(stops, instance) for stops in self.stops]
+        self.loads = [route_load(stops, instance) for stops in self.stops]
+        self.load_capacity = load_capacity
+        self.score = sum(self.lengths)
+        self.exhausted = {}
+        self.exhausted_shared = False
+        self.looking = None
+
+    def copy(self):
+        '''
+        Devuelve una copia de la solucion que se puede modificar sin alterar esta
+        Las listas de paradas se comparten, ya que nunca se modifican, y las unidades
+        agotadas del VND tambien, hasta que una de las dos soluciones anota una nueva
+
+        Returns
+        -------
+            new_solution: Solution
+                Copia de la solucion
+        '''
+        new_solution = Solution.__new__(Solution)
+        new_solution.trucks = self.trucks
+        new_solution.stops = self.stops[:]
+        new_solution.lengths = self.lengths[:]
+        new_solution.loads = self.loads[:]
+        new_solution.load_capacity = self.load_capacity
+        new_solution.score = self.score
+        new_solution.exhausted = self.exhausted
+        new_solution.exhausted_shared = self.exhausted_shared = True
+        new_solution.looking = self.looking
+        return new_solution
+
+    def mark_exhausted(self, unit, state):
+        '''
+        Anota una unidad de busqueda del VND en la que no hay ningun movimiento que mejore
+        Si exhausted esta compartido con otra copia, antes se duplica, quedandose solo con
+        las unidades cuyas rutas no han cambiado
+
+        Parameters
+        ----------
+            unit: tuple
+                Movimiento e indices de las rutas de la unidad
+
+            state: tuple
+                Listas de paradas de esas rutas
+        '''
+        if self.exhausted_shared:
+            stops = self.stops
+            self.exhausted = {key: routes for key, routes in self.exhausted.items()
+                              if routes == tuple(stops[index] for index in key[1])}
+            self.exhausted_shared = False
+        self.exhausted[unit] = state
+
+    def update_route(self, index, stops, change, load_change=0):
+        '''
+        Sustituye las paradas de una ruta conociendo la variacion de su longitud
+        Si se usan bits "don't look", se desactivan los de las paradas de la ruta
+
+        Parameters
+        ----------
+            index: int
+                Indice de la ruta a sustituir
+
+            stops: list
+                Nueva lista de paradas de la ruta
+
+            change: float
+                Diferencia entre la longitud nueva de la ruta y la anterior
+
+            load_change: int
+                Diferencia entre la carga nueva de la ruta y la anterior
+        '''
+        self.stops[index] = stops
+        self.lengths[index] += change
+        self.loads[index] += load_change
+        self.score += change
+        if self.looking is not None:
+            # El conjunto se comparte entre copias, asi que se sustituye en lugar de modificarlo
+            self.looking = self.looking.union(stops)
+
+    def set_route(self, index, stops, length, load_change=0):
+        '''
+        Sustituye las paradas de una ruta conociendo su nueva longitud
+
+        Parameters
+        ----------
+            index: int
+                Indice de la ruta a sustituir
+
+            stops: list
+                Nueva lista de paradas de la ruta
+
+            length: float
+                Longitud de la nueva ruta
+
+            load_change: int
+                Diferencia entre la carga nueva de la ruta y la anterior
+        '''
+        self.update_route(index, stops, length - self.lengths[index], load_change)
+
+    def prefix(self, index, instance):
+        '''
+        Devuelve las sumas acumuladas de una ruta, calculandolas solo si la ruta
+        ha cambiado desde la ultima vez. Se guardan en la cache de la instancia
+
+        Parameters
+        ----------
+            index: int
+                Indice de la ruta
+
+            instance: Instance
+                Instancia del problema con la matriz de distancias y las demandas
+
+        Returns
+        -------
+            prefix: RoutePrefix
+                Sumas acumuladas de la ruta
+        '''
+        return instance.route_prefix(self.stops[index])
+
+    def load_slack(self, index):
+        '''
+        Devuelve cuanto puede aumentar la carga de una ruta sin superar la del camion
+
+        Parameters
+        ----------
+            index: int
+                Indice de la ruta
+
+        Returns
+        -------
+            slack: int
+                Carga que le falta a la ruta para llegar a load_capacity
+        '''
+        return self.load_capacity - self.loads[index]
+
+    def to_routes(self):
+        '''
+        Devuelve las rutas en el formato de lista de diccionarios
+
+        Returns
+        -------
+            routes: list
+                Lista con las rutas que hace cada camion, y el camion que las realiza
+        '''
+        return [{'truck': truck, 'stops': stops[:]} for truck, stops in zip(self.trucks, self.stops)]
+
+
+class Budget:
+    '''
+    Limite de tiempo y de evaluaciones de una ejecucion de general_VNS
+    Cada unidad de busqueda que recorre el VND cuenta tantas evaluaciones como
+    movimientos candidatos llega a evaluar
+
+    Attributes
+    ----------
+        deadline: float
+            Instancia de perf_counter en la que se agota el tiempo, o None sin limite de tiempo
+
+        max_evaluations: int
+            Numero maximo de evaluaciones, o None sin limite de evaluaciones
+
+        evaluations: int
+            Evaluaciones realizadas hasta el momento
+    '''
+    __slots__ = ('deadline', 'max_evaluations', 'evaluations')
+
+    def __init__(self, time_budget=None, evaluation_budget=None):
+        '''
+        Parameters
+        ----------
+            time_budget: float
+                Segundos disponibles desde este momento, o None sin limite de tiempo
+
+            evaluation_budget: int
+                Numero maximo de evaluaciones, o None sin limite de evaluaciones
+        '''
+        self.deadline = None if time_budget is None else perf_counter() + time_budget
+        self.max_evaluations = evaluation_budget
+        self.evaluations = 0
+
+    def spend(self, evaluations):
+        '''
+        Anota evaluaciones realizadas
+
+        Parameters
+        ----------
+            evaluations: int
+                Numero de evaluaciones a anotar
+        '''
+        self.evaluations += evaluations
+
+    def exhausted(self):
+        '''
+        Comprueba si se ha agotado el tiempo o las evaluaciones
+
+        Returns
+        -------
+            exhausted: boolean
+                True si no se puede seguir buscando, False en caso contrario
+        '''
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+        return self.deadline is not None and perf_counter() >= self.deadline
+
+
+class Stats:
+    '''
+    Contadores y tiempos de una ejecucion de general_VNS, que solo se registran
+    si se pasa una instancia a la busqueda
+    Las evaluaciones se cuentan igual que en Budget
+
+    Attributes
+    ----------
+        operators: dict
+            Evaluaciones, movimientos aplicados y segundos de cada movimiento del VND
+
+        shakes: dict
+            Llamadas, intentos y llamadas que agotan MAX_ATTEMPTS de cada vecindario del shake
+
+        descents: dict
+            Numero de VND, movimientos aplicados y segundos para cada valor de k
+
+        moves: int
+            Movimientos aplicados por el VND en toda la ejecucion
+    '''
+    __slots__ = ('operators', 'shakes', 'descents', 'moves')
+
+    def __init__(self):
+        self.operators = {}
+        self.shakes = {}
+        self.descents = {}
+        self.moves = 0
+
+    def record_scan(self, movement, evaluations, seconds):
+        '''
+        Anota el recorrido del vecindario de una unidad de busqueda
+
+        Parameters
+        ----------
+            movement: funcion
+                Movimiento del vecindario
+
+            evaluations: int
+                Movimientos candidatos evaluados en el recorrido
+
+            seconds: float
+                Tiempo empleado en recorrerlo
+        '''
+        counters = self.operators.setdefault(movement.__name__, [0, 0, 0.0])
+        counters[0] += evaluations
+        counters[2] += seconds
+
+    def record_move(self, movement):
+        '''
+        Anota un movimiento aplicado por el VND
+
+        Parameters
+        ----------
+            movement: funcion
+                Movimiento aplicado
+        '''
+        self.operators.setdefault(movement.__name__, [0, 0, 0.0])[1] += 1
+        self.moves += 1
+
+    def record_shake(self, name, attempts, valid):
+        '''
+        Anota una llamada a un vecindario del shake
+
+        Parameters
+        ----------
+            name: string
+                Nombre del vecindario
+
+            attempts: int
+                Intentos realizados hasta generar rutas validas o agotar MAX_ATTEMPTS
+
+            valid: boolean
+                False si se agotaron los intentos sin completar el movimiento
+        '''
+        counters = self.shakes.setdefault(name, [0, 0, 0])
+        counters[0] += 1
+        counters[1] += attempts
+        counters[2] += not valid
+
+    def record_descent(self, k, moves, seconds):
+        '''
+        Anota un VND completo
+
+        Parameters
+        ----------
+            k: int
+                Valor de k del shake previo
+
+            moves: int
+                Movimientos aplicados por el VND
+
+            seconds: float
+                Tiempo empleado por el VND
+        '''
+        counters = self.descents.setdefault(k, [0, 0, 0.0])
+        counters[0] += 1
+        counters[1] += moves
+        counters[2] += seconds
+
+    def rows(self):
+        '''
+        Devuelve todos los contadores como filas (seccion, clave, metrica, valor)
+
+        Returns
+        -------
+            rows: list
+                Lista de tuplas de cadenas
+        '''
+        sections = (('operator', self.operators, ('evaluations', 'accepted', 'seconds')),
+                    ('shake', self.shakes, ('calls', 'attempts', 'failures')),
+                    ('descent', self.descents, ('descents', 'moves', 'seconds')))
+        return [(section, str(key), metric, repr(value))
+                for section, counters, metrics in sections
+                for key in sorted(counters) for metric, value in zip(metrics, counters[key])]
+
 def intra_swap(route, first_element, second_element):
     '''
     Intercambia dos elementos de la misma ruta
@@ -164,6 +1045,47 @@ def intra_swap(route, first_element, second_element):
 
     return new_route
 
+def intra_swap_delta(route, first_element, second_element, instance):
+    '''
+    Calcula la variacion de longitud de intra_swap sin construir la nueva ruta
+    Solo se consultan las aristas adyacentes a los dos elementos intercambiados
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        first_element: int
+            Indice del primer elemento
+
+        second_element: int
+            Indice del segundo elemento
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: float
+            Diferencia entre la longitud de la ruta tras el intercambio y la actual
+
+    '''
+    dist = instance.distances
+    first, second = min(first_element, second_element), max(first_element, second_element)
+    u = route[first]
+    v = route[second]
+    prev_u = route[first-1] if first > 0 else DEPOT
+    next_v = route[second+1] if second + 1 < len(route) else DEPOT
+
+    if second == first + 1:
+        return (dist[prev_u][v] + dist[v][u] + dist[u][next_v]
+                - dist[prev_u][u] - dist[u][v] - dist[v][next_v])
+
+    next_u = route[first+1]
+    prev_v = route[second-1]
+    return (dist[prev_u][v] + dist[v][next_u] + dist[prev_v][u] + dist[u][next_v]
+            - dist[prev_u][u] - dist[u][next_u] - dist[prev_v][v] - dist[v][next_v])
+
 def intra_shift(route, elem_index, shift_index): 
     '''
     Desplaza un elemento de una ruta a una posicion
@@ -192,234 +1114,2664 @@ def intra_shift(route, elem_index, shift_index):
     return new_route
 
 
-def inter_swap(origin_route, dest_route, first_element, second_element):
+def intra_shift_delta(route, elem_index, shift_index, instance):
     '''
-    Intercambia dos elementos de distintas rutas
+    Calcula la variacion de longitud de intra_shift sin construir la nueva ruta
+    La parada en shift_index pasa a ocupar la posicion elem_index
 
     Parameters
     ----------
-        origin_route: list
-            Lista con las paradas de la ruta de origen
-        
-        dest_route: list
-            Lista con las paradas de la ruta de destino
+        route: list
+            Lista con las paradas de la ruta
+
+        elem_index: int
+            Posicion donde se va a insertar el elemento
+
+        shift_index: int
+            Indice del elemento a desplazar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: float
+            Diferencia entre la longitud de la ruta tras el desplazamiento y la actual
+
+    '''
+    if elem_index == shift_index:
+        return 0
+
+    dist = instance.distances
+    last = len(route) - 1
+    moved = route[shift_index]
+    prev_moved = route[shift_index-1] if shift_index > 0 else DEPOT
+    next_moved = route[shift_index+1] if shift_index < last else DEPOT
+
+    if elem_index < shift_index:
+        # La parada se coloca justo antes de route[elem_index]
+        after = route[elem_index]
+        before = route[elem_index-1] if elem_index > 0 else DEPOT
+    else:
+        # La parada se coloca justo despues de route[elem_index]
+        before = route[elem_index]
+        after = route[elem_index+1] if elem_index < last else DEPOT
+
+    return (dist[prev_moved][next_moved] + dist[before][moved] + dist[moved][after]
+            - dist[prev_moved][moved] - dist[moved][next_moved] - dist[before][after])
+
+def intra_two_opt(route, first_element, second_element):
+    '''
+    Movimiento 2-opt: invierte el tramo de la ruta entre dos elementos, ambos incluidos
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
 
         first_element: int
-            Indice del elemento de la ruta de origen
-        
+            Indice de un extremo del tramo
+
         second_element: int
-            Indice del elemento de la ruta de destino
+            Indice del otro extremo del tramo
 
     Returns
     -------
-        (new_origin_route, new_dest_route): tuple
-            Tupla con las listas de las paradas de las rutas despues
-            del intercambio
+        new_route: list
+            Lista con las paradas de la ruta despues de invertir el tramo
 
     '''
-    new_origin_route = origin_route[:]
-    new_dest_route = dest_route[:]
+    first, second = min(first_element, second_element), max(first_element, second_element)
+    return route[:first] + route[second:first - 1 if first > 0 else None:-1] + route[second + 1:]
 
-    aux = new_origin_route[first_element]
-    new_origin_route[first_element] = new_dest_route[second_element]
-    new_dest_route[second_element] = aux
+def intra_two_opt_delta(route, first_element, second_element, instance):
+    '''
+    Calcula la variacion de longitud de intra_two_opt sin construir la nueva ruta
+    Como las distancias son simetricas, el tramo invertido mide lo mismo y solo
+    cambian las dos aristas que lo unen al resto de la ruta
 
-    return (new_origin_route, new_dest_route)
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        first_element: int
+            Indice de un extremo del tramo
+
+        second_element: int
+            Indice del otro extremo del tramo
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: float
+            Diferencia entre la longitud de la ruta tras invertir el tramo y la actual
 
-def inter_shift(origin_route, dest_route, elem_index, shift_index): 
     '''
-    Inserta un elemento de una ruta a una posicion de otra ruta
+    dist = instance.distances
+    first, second = min(first_element, second_element), max(first_element, second_element)
+    u = route[first]
+    v = route[second]
+    prev_u = route[first-1] if first > 0 else DEPOT
+    next_v = route[second+1] if second + 1 < len(route) else DEPOT
+
+    return dist[prev_u][v] + dist[u][next_v] - dist[prev_u][u] - dist[v][next_v]
+
+def intra_or_opt(route, elem_index, shift_index, sequence_length):
+    '''
+    Movimiento Or-opt: desplaza un tramo de paradas consecutivas a otra posicion
+    de la ruta, manteniendo su orden. Con un tramo de una parada es intra_shift
 
     Parameters
     ----------
-        origin_route: list
-            Lista con las paradas de la ruta de origen
-
-        dest_route: list
-            Lista con las paradas de la ruta de destino
+        route: list
+            Lista con las paradas de la ruta
 
         elem_index: int
-            Indice del elemento a desplazar de la ruta de origen
-        
+            Posicion de la nueva ruta en la que empieza el tramo
+
         shift_index: int
-            Posicion donde se va a insertar el elemento den la ruta de destino
+            Indice del primer elemento del tramo a desplazar
+
+        sequence_length: int
+            Numero de paradas del tramo
+
+    Returns
+    -------
+        new_route: list
+            Lista con las paradas de la ruta despues del desplazamiento
+
+    '''
+    rest = route[:shift_index] + route[shift_index + sequence_length:]
+    return rest[:elem_index] + route[shift_index:shift_index + sequence_length] + rest[elem_index:]
+
+def intra_or_opt_delta(route, elem_index, shift_index, sequence_length, instance):
+    '''
+    Calcula la variacion de longitud de intra_or_opt sin construir la nueva ruta
+    Si el tramo no cabe en alguna de las dos posiciones el movimiento no existe
+    y la variacion es 0
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        elem_index: int
+            Posicion de la nueva ruta en la que empieza el tramo
+
+        shift_index: int
+            Indice del primer elemento del tramo a desplazar
+
+        sequence_length: int
+            Numero de paradas del tramo
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: float
+            Diferencia entre la longitud de la ruta tras el desplazamiento y la actual
+
+    '''
+    size = len(route)
+    if elem_index == shift_index or elem_index + sequence_length > size or shift_index + sequence_length > size:
+        return 0
+
+    dist = instance.distances
+    end = shift_index + sequence_length
+    first = route[shift_index]
+    last = route[end-1]
+    prev_first = route[shift_index-1] if shift_index > 0 else DEPOT
+    next_last = route[end] if end < size else DEPOT
+
+    if elem_index < shift_index:
+        # El tramo se coloca justo antes de route[elem_index]
+        before = route[elem_index-1] if elem_index > 0 else DEPOT
+        after = route[elem_index]
+    else:
+        # Sin el tramo, la posicion elem_index corresponde a route[elem_index + sequence_length]
+        before = route[elem_index+sequence_length-1]
+        after = route[elem_index+sequence_length] if elem_index + sequence_length < size else DEPOT
+
+    return (dist[prev_first][next_last] + dist[before][first] + dist[last][after]
+            - dist[prev_first][first] - dist[last][next_last] - dist[before][after])
+
+def intra_or_opt2(route, elem_index, shift_index):
+    '''
+    Wrapper de intra_or_opt con un tramo de dos paradas
+    Usado para tener un formato de movimiento comun en el VND
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        elem_index: int
+            Posicion de la nueva ruta en la que empieza el tramo
+
+        shift_index: int
+            Indice del primer elemento del tramo a desplazar
+
+    Returns
+    -------
+        new_route: list
+            Lista con las paradas de la ruta despues del desplazamiento
+
+    '''
+    return intra_or_opt(route, elem_index, shift_index, 2)
+
+def intra_or_opt2_delta(route, elem_index, shift_index, instance):
+    '''
+    Wrapper de intra_or_opt_delta con un tramo de dos paradas
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        elem_index: int
+            Posicion de la nueva ruta en la que empieza el tramo
+
+        shift_index: int
+            Indice del primer elemento del tramo a desplazar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: float
+            Diferencia entre la longitud de la ruta tras el desplazamiento y la actual
+
+    '''
+    return intra_or_opt_delta(route, elem_index, shift_index, 2, instance)
+
+def intra_or_opt3(route, elem_index, shift_index):
+    '''
+    Wrapper de intra_or_opt con un tramo de tres paradas
+    Usado para tener un formato de movimiento comun en el VND
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        elem_index: int
+            Posicion de la nueva ruta en la que empieza el tramo
+
+        shift_index: int
+            Indice del primer elemento del tramo a desplazar
+
+    Returns
+    -------
+        new_route: list
+            Lista con las paradas de la ruta despues del desplazamiento
+
+    '''
+    return intra_or_opt(route, elem_index, shift_index, 3)
+
+def intra_or_opt3_delta(route, elem_index, shift_index, instance):
+    '''
+    Wrapper de intra_or_opt_delta con un tramo de tres paradas
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        elem_index: int
+            Posicion de la nueva ruta en la que empieza el tramo
+
+        shift_index: int
+            Indice del primer elemento del tramo a desplazar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: float
+            Diferencia entre la longitud de la ruta tras el desplazamiento y la actual
+
+    '''
+    return intra_or_opt_delta(route, elem_index, shift_index, 3, instance)
+
+def inter_swap(origin_route, dest_route, first_element, second_element):
+    '''
+    Intercambia dos elementos de distintas rutas
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+        
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        first_element: int
+            Indice del elemento de la ruta de origen
+        
+        second_element: int
+            Indice del elemento de la ruta de destino
+
+    Returns
+    -------
+        (new_origin_route, new_dest_route): tuple
+            Tupla con las listas de las paradas de las rutas despues
+            del intercambio
+
+    '''
+    new_origin_route = origin_route[:]
+    new_dest_route = dest_route[:]
+
+    aux = new_origin_route[first_element]
+    new_origin_route[first_element] = new_dest_route[second_element]
+    new_dest_route[second_element] = aux
+
+    return (new_origin_route, new_dest_route)
+
+def inter_swap_delta(origin_route, dest_route, first_element, second_element, instance):
+    '''
+    Calcula la variacion de longitud de inter_swap en cada ruta sin construirlas
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        first_element: int
+            Indice del elemento de la ruta de origen
+
+        second_element: int
+            Indice del elemento de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Variacion de longitud de la ruta de origen y de la de destino
+
+    '''
+    dist = instance.distances
+    u = origin_route[first_element]
+    v = dest_route[second_element]
+    prev_u = origin_route[first_element-1] if first_element > 0 else DEPOT
+    next_u = origin_route[first_element+1] if first_element + 1 < len(origin_route) else DEPOT
+    prev_v = dest_route[second_element-1] if second_element > 0 else DEPOT
+    next_v = dest_route[second_element+1] if second_element + 1 < len(dest_route) else DEPOT
+
+    origin_delta = dist[prev_u][v] + dist[v][next_u] - dist[prev_u][u] - dist[u][next_u]
+    dest_delta = dist[prev_v][u] + dist[u][next_v] - dist[prev_v][v] - dist[v][next_v]
+    return (origin_delta, dest_delta)
+
+def inter_shift(origin_route, dest_route, elem_index, shift_index): 
+    '''
+    Inserta un elemento de una ruta a una posicion de otra ruta
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        elem_index: int
+            Indice del elemento a desplazar de la ruta de origen
+        
+        shift_index: int
+            Posicion donde se va a insertar el elemento den la ruta de destino
+
+    Returns
+    -------
+        (new_origin_route, new_dest_route): tuple
+            Tupla con las listas de las paradas de las rutas despues
+            del intercambio
+
+    '''
+    new_origin_route = origin_route[:]
+    new_dest_route = dest_route[:]
+
+    new_dest_route.insert(shift_index, new_origin_route.pop(elem_index))
+
+    return (new_origin_route, new_dest_route)
+
+def inter_shift_delta(origin_route, dest_route, elem_index, shift_index, instance):
+    '''
+    Calcula la variacion de longitud de inter_shift en cada ruta sin construirlas
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        elem_index: int
+            Indice del elemento a desplazar de la ruta de origen
+
+        shift_index: int
+            Posicion donde se va a insertar el elemento en la ruta de destino
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Variacion de longitud de la ruta de origen y de la de destino
+
+    '''
+    dist = instance.distances
+    u = origin_route[elem_index]
+    prev_u = origin_route[elem_index-1] if elem_index > 0 else DEPOT
+    next_u = origin_route[elem_index+1] if elem_index + 1 < len(origin_route) else DEPOT
+    before = dest_route[shift_index-1] if shift_index > 0 else DEPOT
+    after = dest_route[shift_index] if shift_index < len(dest_route) else DEPOT
+
+    origin_delta = dist[prev_u][next_u] - dist[prev_u][u] - dist[u][next_u]
+    dest_delta = dist[before][u] + dist[u][after] - dist[before][after]
+    return (origin_delta, dest_delta)
+
+def inter_swap_load(origin_prefix, dest_prefix, first_element, second_element, instance):
+    '''
+    Calcula la variacion de carga de inter_swap en cada ruta sin construirlas
+
+    Parameters
+    ----------
+        origin_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de origen
+
+        dest_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de destino
+
+        first_element: int
+            Indice del elemento de la ruta de origen
+
+        second_element: int
+            Indice del elemento de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    Returns
+    -------
+        (origin_change, dest_change): tuple
+            Variacion de carga de la ruta de origen y de la de destino
+
+    '''
+    change = dest_prefix.segment_load(second_element, second_element + 1) - origin_prefix.segment_load(first_element, first_element + 1)
+    return (change, -change)
+
+def inter_shift_load(origin_prefix, dest_prefix, elem_index, shift_index, instance):
+    '''
+    Calcula la variacion de carga de inter_shift en cada ruta sin construirlas
+
+    Parameters
+    ----------
+        origin_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de origen
+
+        dest_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de destino
+
+        elem_index: int
+            Indice del elemento a desplazar de la ruta de origen
+
+        shift_index: int
+            Posicion donde se va a insertar el elemento en la ruta de destino
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    Returns
+    -------
+        (origin_change, dest_change): tuple
+            Variacion de carga de la ruta de origen y de la de destino
+
+    '''
+    moved = origin_prefix.segment_load(elem_index, elem_index + 1)
+    return (-moved, moved)
+
+def inter_swap_candidates(origin_route, dest_route, neighbours):
+    '''
+    Genera los pares de indices de inter_swap que colocan alguna de las dos paradas
+    intercambiadas junto a uno de sus vecinos mas cercanos en la otra ruta
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada, obtenidos con nearest_neighbours
+
+    Returns
+    -------
+        candidates: list
+            Pares (indice en origen, indice en destino) ordenados
+    '''
+    candidates = set()
+    origin_positions = {stop: index for index, stop in enumerate(origin_route)}
+    dest_positions = {stop: index for index, stop in enumerate(dest_route)}
+    last_origin = len(origin_route) - 1
+    last_dest = len(dest_route) - 1
+
+    for i, stop in enumerate(origin_route):
+        for neighbour in neighbours[stop]:
+            position = dest_positions.get(neighbour)
+            if position is not None:
+                # La parada sustituye a la que esta justo antes o justo despues de su vecino
+                if position > 0:
+                    candidates.add((i, position - 1))
+                if position < last_dest:
+                    candidates.add((i, position + 1))
+
+    for j, stop in enumerate(dest_route):
+        for neighbour in neighbours[stop]:
+            position = origin_positions.get(neighbour)
+            if position is not None:
+                if position > 0:
+                    candidates.add((position - 1, j))
+                if position < last_origin:
+                    candidates.add((position + 1, j))
+
+    return sorted(candidates)
+
+def inter_shift_candidates(origin_route, dest_route, neighbours):
+    '''
+    Genera los pares de indices de inter_shift que insertan la parada de origen
+    justo antes o justo despues de uno de sus vecinos mas cercanos
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada, obtenidos con nearest_neighbours
+
+    Returns
+    -------
+        candidates: list
+            Pares (indice en origen, posicion en destino) ordenados
+    '''
+    candidates = set()
+    dest_positions = {stop: index for index, stop in enumerate(dest_route)}
+    last_dest = len(dest_route) - 1
+
+    for i, stop in enumerate(origin_route):
+        for neighbour in neighbours[stop]:
+            position = dest_positions.get(neighbour)
+            if position is not None:
+                candidates.add((i, position))
+                if position < last_dest:
+                    candidates.add((i, position + 1))
+
+    return sorted(candidates)
+
+def inter_two_opt_star_candidates(origin_route, dest_route, neighbours):
+    '''
+    Genera los pares de cortes de inter_two_opt_star que hacen que una parada vaya
+    seguida de uno de sus vecinos mas cercanos de la otra ruta
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada, obtenidos con nearest_neighbours
+
+    Returns
+    -------
+        candidates: list
+            Pares (corte en origen, corte en destino) ordenados
+    '''
+    candidates = set()
+    origin_positions = {stop: index for index, stop in enumerate(origin_route)}
+    dest_positions = {stop: index for index, stop in enumerate(dest_route)}
+
+    for i, stop in enumerate(origin_route):
+        for neighbour in neighbours[stop]:
+            position = dest_positions.get(neighbour)
+            # La parada pasa a ir seguida de su vecino si se corta justo despues de ella
+            # y justo antes de el
+            if position is not None:
+                candidates.add((i + 1, position))
+
+    for j, stop in enumerate(dest_route):
+        for neighbour in neighbours[stop]:
+            position = origin_positions.get(neighbour)
+            if position is not None:
+                candidates.add((position, j + 1))
+
+    return sorted(candidates)
+
+def sequence_exchange(origin_route, dest_route, first_element, second_element, sequence_length, dest_length=None, reverse=False):
+    '''
+    Intercambia una secuencia de elementos de distintas rutas
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+        
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        first_element: int
+            Indice del primer elemento de la ruta de origen
+        
+        second_element: int
+            Indice del primer elemento de la ruta de destino
+        
+        sequence_length: int
+            Longitud de la secuencia a intercambiar
+
+        dest_length: int
+            Longitud de la secuencia de la ruta de destino, o None si es la misma
+            que la de la ruta de origen
+
+        reverse: boolean
+            Si es True cada secuencia se inserta en la otra ruta en orden inverso
+
+    Returns
+    -------
+        (new_origin_route, new_dest_route): tuple
+            Tupla con las listas de las paradas de las rutas despues
+            del intercambio
+
+    '''
+    dest_length = sequence_length if dest_length is None else dest_length
+    origin_sequence = origin_route[first_element:first_element + sequence_length]
+    dest_sequence = dest_route[second_element:second_element + dest_length]
+    if reverse:
+        origin_sequence.reverse()
+        dest_sequence.reverse()
+
+    new_origin_route = origin_route[:first_element] + dest_sequence + origin_route[first_element + sequence_length:]
+    new_dest_route = dest_route[:second_element] + origin_sequence + dest_route[second_element + dest_length:]
+    return (new_origin_route, new_dest_route)
+
+def sequence_exchange_delta(origin_prefix, dest_prefix, first_element, second_element, sequence_length, instance, dest_length=None, reverse=False):
+    '''
+    Calcula en tiempo constante la variacion de longitud de sequence_exchange en
+    cada ruta a partir de sus sumas acumuladas, sin construirlas
+
+    Parameters
+    ----------
+        origin_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de origen
+
+        dest_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de destino
+
+        first_element: int
+            Indice del primer elemento de la ruta de origen
+
+        second_element: int
+            Indice del primer elemento de la ruta de destino
+
+        sequence_length: int
+            Longitud de la secuencia de la ruta de origen
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        dest_length: int
+            Longitud de la secuencia de la ruta de destino, o None si es la misma
+
+        reverse: boolean
+            Si es True cada secuencia se inserta en la otra ruta en orden inverso
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Variacion de longitud de la ruta de origen y de la de destino
+
+    '''
+    dist = instance.distances
+    dest_length = sequence_length if dest_length is None else dest_length
+    origin_nodes = origin_prefix.nodes
+    dest_nodes = dest_prefix.nodes
+    origin_end = first_element + sequence_length
+    dest_end = second_element + dest_length
+    # En nodes la parada i esta en la posicion i+1
+    prev_u, next_u = origin_nodes[first_element], origin_nodes[origin_end + 1]
+    prev_v, next_v = dest_nodes[second_element], dest_nodes[dest_end + 1]
+    origin_inner = origin_prefix.segment_length(first_element, origin_end)
+    dest_inner = dest_prefix.segment_length(second_element, dest_end)
+    # Extremos de cada secuencia vacia: la arista que se rompe es la que une sus vecinos
+    first_u, last_u = (origin_nodes[first_element + 1], origin_nodes[origin_end]) if sequence_length else (next_u, prev_u)
+    first_v, last_v = (dest_nodes[second_element + 1], dest_nodes[dest_end]) if dest_length else (next_v, prev_v)
+    if reverse:
+        in_u, out_u, in_v, out_v = last_u, first_u, last_v, first_v
+    else:
+        in_u, out_u, in_v, out_v = first_u, last_u, first_v, last_v
+
+    removed_u = dist[prev_u][first_u] + dist[last_u][next_u] if sequence_length else dist[prev_u][next_u]
+    removed_v = dist[prev_v][first_v] + dist[last_v][next_v] if dest_length else dist[prev_v][next_v]
+    added_v = dist[prev_u][in_v] + dist[out_v][next_u] if dest_length else dist[prev_u][next_u]
+    added_u = dist[prev_v][in_u] + dist[out_u][next_v] if sequence_length else dist[prev_v][next_v]
+
+    origin_delta = added_v + dest_inner - removed_u - origin_inner
+    dest_delta = added_u + origin_inner - removed_v - dest_inner
+    return (origin_delta, dest_delta)
+
+def sequence_exchange_load(origin_prefix, dest_prefix, first_element, second_element, sequence_length, dest_length=None):
+    '''
+    Calcula en tiempo constante la variacion de carga de sequence_exchange en cada ruta
+
+    Parameters
+    ----------
+        origin_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de origen
+
+        dest_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de destino
+
+        first_element: int
+            Indice del primer elemento de la ruta de origen
+
+        second_element: int
+            Indice del primer elemento de la ruta de destino
+
+        sequence_length: int
+            Longitud de la secuencia de la ruta de origen
+
+        dest_length: int
+            Longitud de la secuencia de la ruta de destino, o None si es la misma
+
+    Returns
+    -------
+        (origin_change, dest_change): tuple
+            Variacion de carga de la ruta de origen y de la de destino
+
+    '''
+    dest_length = sequence_length if dest_length is None else dest_length
+    change = (dest_prefix.segment_load(second_element, second_element + dest_length)
+              - origin_prefix.segment_load(first_element, first_element + sequence_length))
+    return (change, -change)
+
+def inter_two_opt_star(origin_route, dest_route, first_element, second_element):
+    '''
+    Movimiento 2-opt*: intercambia los finales de dos rutas. Cada ruta conserva sus
+    paradas anteriores al corte y continua con el final de la otra. Un corte en 0
+    entrega la ruta entera y uno en len(route) no entrega nada
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        first_element: int
+            Indice de la primera parada del final de la ruta de origen, de 0 a len(origin_route)
+
+        second_element: int
+            Indice de la primera parada del final de la ruta de destino, de 0 a len(dest_route)
+
+    Returns
+    -------
+        (new_origin_route, new_dest_route): tuple
+            Tupla con las listas de las paradas de las rutas despues
+            del intercambio
+
+    '''
+    return (origin_route[:first_element] + dest_route[second_element:],
+            dest_route[:second_element] + origin_route[first_element:])
+
+def inter_two_opt_star_delta(origin_route, dest_route, first_element, second_element, instance):
+    '''
+    Calcula la variacion de longitud de inter_two_opt_star en cada ruta sin construirlas
+    Los finales intercambiados se recorren en el mismo sentido, asi que su longitud
+    pasa de una ruta a otra y basta con las aristas que se cortan y las que se crean.
+    Para esa longitud se usan las sumas acumuladas de cada ruta
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        first_element: int
+            Indice de la primera parada del final de la ruta de origen, de 0 a len(origin_route)
+
+        second_element: int
+            Indice de la primera parada del final de la ruta de destino, de 0 a len(dest_route)
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Variacion de longitud de la ruta de origen y de la de destino
+
+    '''
+    dist = instance.distances
+    # Parada anterior a cada corte y primera del final, o el deposito en los extremos
+    u = origin_route[first_element - 1] if first_element > 0 else DEPOT
+    v = dest_route[second_element - 1] if second_element > 0 else DEPOT
+    next_u = origin_route[first_element] if first_element < len(origin_route) else DEPOT
+    next_v = dest_route[second_element] if second_element < len(dest_route) else DEPOT
+    # Longitud de cada final desde su primera parada hasta el deposito
+    origin_tail = route_tail_length(origin_route, first_element, instance)
+    dest_tail = route_tail_length(dest_route, second_element, instance)
+
+    origin_delta = dist[u][next_v] + dest_tail - dist[u][next_u] - origin_tail
+    dest_delta = dist[v][next_u] + origin_tail - dist[v][next_v] - dest_tail
+    return (origin_delta, dest_delta)
+
+def route_tail_length(route, start, instance):
+    '''
+    Longitud del final de una ruta desde la parada start hasta el deposito
+    Se obtiene de las sumas acumuladas de la ruta, que se guardan mientras la
+    lista de paradas siga en uso, por lo que solo se calculan una vez por ruta
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        start: int
+            Indice de la primera parada del final
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        length: float
+            Longitud desde route[start] hasta el deposito, 0 si el final esta vacio
+    '''
+    if start >= len(route):
+        return 0
+    prefix = instance.route_prefix(route)
+    return prefix.lengths[-1] - prefix.lengths[start + 1]
+
+def inter_two_opt_star_load(origin_prefix, dest_prefix, first_element, second_element, instance):
+    '''
+    Calcula la variacion de carga de inter_two_opt_star en cada ruta sin construirlas
+
+    Parameters
+    ----------
+        origin_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de origen
+
+        dest_prefix: RoutePrefix
+            Sumas acumuladas de la ruta de destino
+
+        first_element: int
+            Indice de la primera parada del final de la ruta de origen, de 0 a len(origin_route)
+
+        second_element: int
+            Indice de la primera parada del final de la ruta de destino, de 0 a len(dest_route)
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    Returns
+    -------
+        (origin_change, dest_change): tuple
+            Variacion de carga de la ruta de origen y de la de destino
+
+    '''
+    change = ((dest_prefix.loads[-1] - dest_prefix.loads[second_element])
+              - (origin_prefix.loads[-1] - origin_prefix.loads[first_element]))
+    return (change, -change)
+
+def cross_exchange_delta(origin_route, dest_route, first_element, second_element, origin_length, dest_length, instance):
+    '''
+    Calcula la variacion de longitud del CROSS-exchange en cada ruta sin construirlas
+    Es la misma que la de sequence_exchange_delta, con las sumas acumuladas de cada ruta
+    Si alguno de los tramos no cabe en su ruta el movimiento no existe y la variacion es 0
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        first_element: int
+            Indice del primer elemento del tramo de la ruta de origen
+
+        second_element: int
+            Indice del primer elemento del tramo de la ruta de destino
+
+        origin_length: int
+            Numero de paradas del tramo de la ruta de origen
+
+        dest_length: int
+            Numero de paradas del tramo de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Variacion de longitud de la ruta de origen y de la de destino
+
+    '''
+    if first_element + origin_length > len(origin_route) or second_element + dest_length > len(dest_route):
+        return (0, 0)
+
+    return sequence_exchange_delta(instance.route_prefix(origin_route), instance.route_prefix(dest_route),
+                                   first_element, second_element, origin_length, instance, dest_length)
+
+def cross_exchange_movement(origin_length, dest_length):
+    '''
+    Crea el movimiento CROSS-exchange que intercambia un tramo de origin_length paradas
+    de una ruta por otro de dest_length paradas de otra, con el formato de movimiento
+    entre rutas del VND, y registra su evaluacion incremental y su variacion de carga
+
+    Parameters
+    ----------
+        origin_length: int
+            Numero de paradas del tramo de la ruta de origen
+
+        dest_length: int
+            Numero de paradas del tramo de la ruta de destino
+
+    Returns
+    -------
+        movement: funcion
+            Movimiento (origin_route, dest_route, i, j) que intercambia los tramos que
+            empiezan en i y en j. Si un tramo esta vacio, su indice llega hasta el
+            final de la ruta
+    '''
+    def movement(origin_route, dest_route, first_element, second_element):
+        return sequence_exchange(origin_route, dest_route, first_element, second_element, origin_length, dest_length)
+
+    def delta(origin_route, dest_route, first_element, second_element, instance):
+        return cross_exchange_delta(origin_route, dest_route, first_element, second_element, origin_length, dest_length, instance)
+
+    def load(origin_prefix, dest_prefix, first_element, second_element, instance):
+        return sequence_exchange_load(origin_prefix, dest_prefix, first_element, second_element, origin_length, dest_length)
+
+    # Con el mismo nombre que la variable del modulo, el movimiento se puede serializar
+    movement.__name__ = movement.__qualname__ = f'inter_cross{origin_length}{dest_length}'
+    MOVEMENT_DELTAS[movement] = delta
+    MOVEMENT_LOADS[movement] = load
+    # Un tramo vacio tambien se puede insertar al final de su ruta
+    MOVEMENT_POSITIONS[movement] = (int(origin_length == 0), int(dest_length == 0))
+    return movement
+
+# Funcion de evaluacion incremental asociada a cada movimiento del VND
+MOVEMENT_DELTAS = {
+    intra_swap: intra_swap_delta,
+    intra_shift: intra_shift_delta,
+    intra_two_opt: intra_two_opt_delta,
+    intra_or_opt2: intra_or_opt2_delta,
+    intra_or_opt3: intra_or_opt3_delta,
+    inter_swap: inter_swap_delta,
+    inter_shift: inter_shift_delta,
+    inter_two_opt_star: inter_two_opt_star_delta,
+}
+
+# Variacion de carga de cada movimiento entre rutas, para comprobar la capacidad de los camiones
+MOVEMENT_LOADS = {
+    inter_swap: inter_swap_load,
+    inter_shift: inter_shift_load,
+    inter_two_opt_star: inter_two_opt_star_load,
+}
+
+# Posiciones que un movimiento entre rutas prueba en cada ruta ademas de una por parada.
+# Los cortes de 2-opt* y las inserciones de un tramo vacio pueden estar tras la ultima parada
+MOVEMENT_POSITIONS = {
+    inter_two_opt_star: (1, 1),
+}
+
+# CROSS-exchange entre tramos de hasta tres paradas. El de una parada por una es inter_swap,
+# el de una por ninguna es inter_shift, y como el VND recorre los pares de rutas en los dos
+# sentidos no hace falta el de un tramo corto por uno largo
+inter_cross20 = cross_exchange_movement(2, 0)
+inter_cross21 = cross_exchange_movement(2, 1)
+inter_cross22 = cross_exchange_movement(2, 2)
+inter_cross30 = cross_exchange_movement(3, 0)
+inter_cross31 = cross_exchange_movement(3, 1)
+inter_cross32 = cross_exchange_movement(3, 2)
+inter_cross33 = cross_exchange_movement(3, 3)
+
+# Generador de movimientos prometedores de cada movimiento entre rutas para el vecindario granular
+GRANULAR_CANDIDATES = {
+    inter_swap: inter_swap_candidates,
+    inter_shift: inter_shift_candidates,
+    inter_two_opt_star: inter_two_opt_star_candidates,
+}
+
+def movement_positions(movement, first_stops, second_stops):
+    '''
+    Numero de indices que recorre un movimiento entre rutas en cada una de ellas
+
+    Parameters
+    ----------
+        movement: funcion
+            Movimiento entre distintas rutas
+
+        first_stops: list
+            Lista con las paradas de la primera ruta
+
+        second_stops: list
+            Lista con las paradas de la segunda ruta
+
+    Returns
+    -------
+        (first_positions, second_positions): tuple
+            Indices de la primera ruta y de la segunda
+    '''
+    first_extra, second_extra = MOVEMENT_POSITIONS.get(movement, (0, 0))
+    return (len(first_stops) + first_extra, len(second_stops) + second_extra)
+
+def looked_positions(first_stops, positions, looking):
+    '''
+    Indica desde que indices de la primera ruta se prueban movimientos con los bits
+    "don't look". Los indices tras la ultima parada no son de ninguna parada, asi que
+    se prueban siempre
+
+    Parameters
+    ----------
+        first_stops: list
+            Lista con las paradas de la primera ruta
+
+        positions: int
+            Indices de la primera ruta que recorre el movimiento
+
+        looking: set
+            Paradas desde las que se prueban movimientos
+
+    Returns
+    -------
+        looked: list
+            Booleano de cada indice
+    '''
+    return [stop in looking for stop in first_stops] + [True] * (positions - len(first_stops))
+
+def intra_route_move(stops, rl, movement, instance, capacity, best=False):
+    '''
+    Busca un movimiento dentro de una ruta que reduzca su longitud
+
+    Parameters
+    ----------
+        stops: list
+            Lista con las paradas de la ruta
+
+        rl: float
+            Longitud actual de la ruta
+
+        movement: funcion
+            Movimiento dentro de la misma ruta a probar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        best: boolean
+            Si es True devuelve el mejor movimiento, si no el primero que mejora
+
+    Returns
+    -------
+        move: tuple
+            Tupla (variacion, i, j) con el movimiento encontrado, o None si
+            ningun movimiento mejora la ruta
+
+        evaluations: int
+            Movimientos candidatos evaluados
+
+    '''
+    delta = MOVEMENT_DELTAS[movement]
+    found = None
+    evaluations = 0
+    # For each pair of elements in the same route
+    for i, j in permutations(range(0,len(stops)), 2):
+        evaluations += 1
+        change = delta(stops, i, j, instance)
+        if change < -IMPROVEMENT_EPSILON and rl + change < capacity:
+            if not best:
+                return (change, i, j), evaluations
+            if found is None or change < found[0]:
+                found = (change, i, j)
+
+    return found, evaluations
+
+def inter_route_move(first_stops, second_stops, first_rl, second_rl, movement, instance, capacity, neighbours=None, best=False, looking=None, slacks=None):
+    '''
+    Busca un movimiento entre dos rutas que reduzca la suma de sus longitudes
+
+    Parameters
+    ----------
+        first_stops: list
+            Lista con las paradas de la primera ruta
+
+        second_stops: list
+            Lista con las paradas de la segunda ruta
+
+        first_rl: float
+            Longitud actual de la primera ruta
+
+        second_rl: float
+            Longitud actual de la segunda ruta
+
+        movement: funcion
+            Movimiento entre distintas rutas a probar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular, o None
+            para probar todos los movimientos
+
+        best: boolean
+            Si es True devuelve el mejor movimiento, si no el primero que mejora
+
+        looking: set
+            Paradas de la primera ruta desde las que se prueban movimientos, o
+            None para probar desde todas
+
+        slacks: tuple
+            Carga que puede ganar cada una de las dos rutas, o None si no se tienen
+            en cuenta las demandas
+
+    Returns
+    -------
+        move: tuple
+            Tupla (variacion total, variacion de la primera ruta, variacion de la
+            segunda ruta, i, j) con el movimiento encontrado, o None si ningun
+            movimiento mejora las rutas
+
+        evaluations: int
+            Movimientos candidatos evaluados
+
+    '''
+    delta = MOVEMENT_DELTAS[movement]
+    load = MOVEMENT_LOADS[movement]
+    if slacks is not None:
+        first_prefix, second_prefix = instance.route_prefix(first_stops), instance.route_prefix(second_stops)
+    first_positions, second_positions = movement_positions(movement, first_stops, second_stops)
+    looked = None if looking is None else looked_positions(first_stops, first_positions, looking)
+    # Los movimientos sin generador de candidatos recorren siempre el vecindario completo
+    if neighbours is None or movement not in GRANULAR_CANDIDATES:
+        origins = range(0, first_positions)
+        if looking is not None:
+            origins = [i for i in origins if looked[i]]
+        candidates = product(origins, range(0, second_positions))
+    else:
+        candidates = GRANULAR_CANDIDATES[movement](first_stops, second_stops, neighbours)
+        if looking is not None:
+            candidates = [(i, j) for i, j in candidates if looked[i]]
+
+    found = None
+    evaluations = 0
+    # For each pair of elements of the two routes selected
+    for i, j in candidates:
+        evaluations += 1
+        first_change, second_change = delta(first_stops, second_stops, i, j, instance)
+        change = first_change + second_change
+
+        if change < -IMPROVEMENT_EPSILON and first_rl + first_change < capacity and second_rl + second_change < capacity:
+            # La carga solo se comprueba en los movimientos que ya mejoran y caben en la distancia
+            if slacks is not None:
+                first_load, second_load = load(first_prefix, second_prefix, i, j, instance)
+                if first_load > slacks[0] or second_load > slacks[1]:
+                    continue
+            if not best:
+                return (change, first_change, second_change, i, j), evaluations
+            if found is None or change < found[0]:
+                found = (change, first_change, second_change, i, j)
+
+    return found, evaluations
+
+def padded_route(stops):
+    '''
+    Devuelve las paradas de una ruta como array con el deposito al principio y al final,
+    de forma que la parada i tiene a su anterior en i y a su siguiente en i+2
+
+    Parameters
+    ----------
+        stops: list
+            Lista con las paradas de la ruta
+
+    Returns
+    -------
+        padded: numpy.ndarray
+            Array con el deposito, las paradas y de nuevo el deposito
+
+    '''
+    return np.array([DEPOT] + stops + [DEPOT])
+
+def intra_swap_delta_matrix(route, instance):
+    '''
+    Calcula a la vez la variacion de longitud de intra_swap para cada par de indices
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: numpy.ndarray
+            Matriz con la variacion de intra_swap(route, i, j) en la posicion (i, j).
+            La diagonal no tiene sentido y debe descartarse
+
+    '''
+    dist = instance.matrix
+    padded = padded_route(route)
+    index = np.arange(len(route))
+    first = np.minimum(index[:, np.newaxis], index[np.newaxis, :])
+    second = np.maximum(index[:, np.newaxis], index[np.newaxis, :])
+    u = padded[first + 1]
+    v = padded[second + 1]
+    prev_u = padded[first]
+    next_u = padded[first + 2]
+    prev_v = padded[second]
+    next_v = padded[second + 2]
+
+    # El primer termino se pasa a float64 para que, si la matriz esta guardada como float32
+    # o entera, las sumas se hagan con la misma precision que las de la funcion delta
+    general = (dist[prev_u, v].astype(np.float64) + dist[v, next_u] + dist[prev_v, u] + dist[u, next_v]
+               - dist[prev_u, u] - dist[u, next_u] - dist[prev_v, v] - dist[v, next_v])
+    adjacent = (dist[prev_u, v].astype(np.float64) + dist[v, u] + dist[u, next_v]
+                - dist[prev_u, u] - dist[u, v] - dist[v, next_v])
+    return np.where(second == first + 1, adjacent, general)
+
+def intra_shift_delta_matrix(route, instance):
+    '''
+    Calcula a la vez la variacion de longitud de intra_shift para cada par de indices
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: numpy.ndarray
+            Matriz con la variacion de intra_shift(route, i, j) en la posicion (i, j).
+            La diagonal no tiene sentido y debe descartarse
+
+    '''
+    dist = instance.matrix
+    padded = padded_route(route)
+    index = np.arange(len(route))
+    elem_index = index[:, np.newaxis]
+    shift_index = index[np.newaxis, :]
+    moved = padded[shift_index + 1]
+    prev_moved = padded[shift_index]
+    next_moved = padded[shift_index + 2]
+    before = np.where(elem_index < shift_index, padded[elem_index], padded[elem_index + 1])
+    after = np.where(elem_index < shift_index, padded[elem_index + 1], padded[elem_index + 2])
+
+    return (dist[prev_moved, next_moved].astype(np.float64) + dist[before, moved] + dist[moved, after]
+            - dist[prev_moved, moved] - dist[moved, next_moved] - dist[before, after])
+
+def intra_two_opt_delta_matrix(route, instance):
+    '''
+    Calcula a la vez la variacion de longitud de intra_two_opt para cada par de indices
+
+    Parameters
+    ----------
+        route: list
+            Lista con las paradas de la ruta
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        delta: numpy.ndarray
+            Matriz con la variacion de intra_two_opt(route, i, j) en la posicion (i, j).
+            La diagonal no tiene sentido y debe descartarse
+
+    '''
+    dist = instance.matrix
+    padded = padded_route(route)
+    index = np.arange(len(route))
+    first = np.minimum(index[:, np.newaxis], index[np.newaxis, :])
+    second = np.maximum(index[:, np.newaxis], index[np.newaxis, :])
+    u = padded[first + 1]
+    v = padded[second + 1]
+    prev_u = padded[first]
+    next_v = padded[second + 2]
+
+    return dist[prev_u, v].astype(np.float64) + dist[u, next_v] - dist[prev_u, u] - dist[v, next_v]
+
+def inter_swap_delta_matrix(origin_route, dest_route, instance):
+    '''
+    Calcula a la vez la variacion de longitud de inter_swap para cada par de indices
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Matrices con la variacion de cada ruta para inter_swap(origin, dest, i, j)
+            en la posicion (i, j)
+
+    '''
+    dist = instance.matrix
+    origin = padded_route(origin_route)
+    dest = padded_route(dest_route)
+    i = np.arange(len(origin_route))[:, np.newaxis]
+    j = np.arange(len(dest_route))[np.newaxis, :]
+    u, prev_u, next_u = origin[i + 1], origin[i], origin[i + 2]
+    v, prev_v, next_v = dest[j + 1], dest[j], dest[j + 2]
+
+    origin_delta = dist[prev_u, v].astype(np.float64) + dist[v, next_u] - dist[prev_u, u] - dist[u, next_u]
+    dest_delta = dist[prev_v, u].astype(np.float64) + dist[u, next_v] - dist[prev_v, v] - dist[v, next_v]
+    return (origin_delta, dest_delta)
+
+def inter_shift_delta_matrix(origin_route, dest_route, instance):
+    '''
+    Calcula a la vez la variacion de longitud de inter_shift para cada par de indices
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Matrices con la variacion de cada ruta para inter_shift(origin, dest, i, j)
+            en la posicion (i, j)
+
+    '''
+    dist = instance.matrix
+    origin = padded_route(origin_route)
+    dest = padded_route(dest_route)
+    i = np.arange(len(origin_route))[:, np.newaxis]
+    j = np.arange(len(dest_route))[np.newaxis, :]
+    u, prev_u, next_u = origin[i + 1], origin[i], origin[i + 2]
+    before, after = dest[j], dest[j + 1]
+
+    origin_delta = dist[prev_u, next_u].astype(np.float64) - dist[prev_u, u] - dist[u, next_u]
+    dest_delta = dist[before, u].astype(np.float64) + dist[u, after] - dist[before, after]
+    return (np.broadcast_to(origin_delta, dest_delta.shape), dest_delta)
+
+def inter_swap_load_matrix(origin_route, dest_route, instance):
+    '''
+    Calcula a la vez la variacion de carga de inter_swap para cada par de indices
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    Returns
+    -------
+        (origin_change, dest_change): tuple
+            Matrices con la variacion de carga de cada ruta para
+            inter_swap(origin, dest, i, j) en la posicion (i, j)
+
+    '''
+    change = instance.demands[dest_route][np.newaxis, :] - instance.demands[origin_route][:, np.newaxis]
+    return (change, -change)
+
+def inter_shift_load_matrix(origin_route, dest_route, instance):
+    '''
+    Calcula a la vez la variacion de carga de inter_shift para cada par de indices
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    Returns
+    -------
+        (origin_change, dest_change): tuple
+            Matrices con la variacion de carga de cada ruta para
+            inter_shift(origin, dest, i, j) en la posicion (i, j)
+
+    '''
+    moved = np.broadcast_to(instance.demands[origin_route][:, np.newaxis], (len(origin_route), len(dest_route)))
+    return (-moved, moved)
+
+def inter_two_opt_star_load_matrix(origin_route, dest_route, instance):
+    '''
+    Calcula a la vez la variacion de carga de inter_two_opt_star para cada par de indices
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    Returns
+    -------
+        (origin_change, dest_change): tuple
+            Matrices con la variacion de carga de cada ruta para
+            inter_two_opt_star(origin, dest, i, j) en la posicion (i, j)
+
+    '''
+    origin_loads = np.array(instance.route_prefix(origin_route).loads)
+    dest_loads = np.array(instance.route_prefix(dest_route).loads)
+    # Carga del final de cada ruta desde la parada i
+    origin_tail = origin_loads[-1] - origin_loads[:, np.newaxis]
+    dest_tail = dest_loads[-1] - dest_loads[np.newaxis, :]
+    change = dest_tail - origin_tail
+    return (change, -change)
+
+def inter_two_opt_star_delta_matrix(origin_route, dest_route, instance):
+    '''
+    Calcula a la vez la variacion de longitud de inter_two_opt_star para cada par de indices
+
+    Parameters
+    ----------
+        origin_route: list
+            Lista con las paradas de la ruta de origen
+
+        dest_route: list
+            Lista con las paradas de la ruta de destino
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (origin_delta, dest_delta): tuple
+            Matrices con la variacion de cada ruta para inter_two_opt_star(origin, dest, i, j)
+            en la posicion (i, j)
+
+    '''
+    dist = instance.matrix
+    origin_prefix = instance.route_prefix(origin_route)
+    dest_prefix = instance.route_prefix(dest_route)
+    origin = padded_route(origin_route)
+    dest = padded_route(dest_route)
+    i = np.arange(len(origin_route) + 1)[:, np.newaxis]
+    j = np.arange(len(dest_route) + 1)[np.newaxis, :]
+    u, next_u = origin[i], origin[i + 1]
+    v, next_v = dest[j], dest[j + 1]
+    # Longitud de cada final desde su primera parada hasta el deposito, 0 si esta vacio
+    origin_lengths = np.array(origin_prefix.lengths)
+    dest_lengths = np.array(dest_prefix.lengths)
+    origin_tail = origin_lengths[-1] - origin_lengths[i + 1]
+    dest_tail = dest_lengths[-1] - dest_lengths[j + 1]
+
+    origin_delta = dist[u, next_v].astype(np.float64) + dest_tail - dist[u, next_u] - origin_tail
+    dest_delta = dist[v, next_u].astype(np.float64) + origin_tail - dist[v, next_v] - dest_tail
+    return (origin_delta, dest_delta)
+
+# Evaluacion vectorizada de cada movimiento para el motor 'numpy' del VND
+NUMPY_DELTAS = {
+    intra_swap: intra_swap_delta_matrix,
+    intra_shift: intra_shift_delta_matrix,
+    intra_two_opt: intra_two_opt_delta_matrix,
+    inter_swap: inter_swap_delta_matrix,
+    inter_shift: inter_shift_delta_matrix,
+    inter_two_opt_star: inter_two_opt_star_delta_matrix,
+}
+
+# Variacion de carga vectorizada de cada movimiento entre rutas para el motor 'numpy'
+NUMPY_LOADS = {
+    inter_swap: inter_swap_load_matrix,
+    inter_shift: inter_shift_load_matrix,
+    inter_two_opt_star: inter_two_opt_star_load_matrix,
+}
+
+# Con menos movimientos que estos en el vecindario completo, el coste fijo de las operaciones
+# de numpy supera al del bucle en Python, y el motor 'numpy' recorre el vecindario en Python
+NUMPY_MIN_MOVES = 64
+
+def select_move(change, valid, best):
+    '''
+    Escoge un movimiento de una matriz de variaciones ya filtrada
+
+    Parameters
+    ----------
+        change: numpy.ndarray
+            Variacion total de cada movimiento
+
+        valid: numpy.ndarray
+            Mascara con los movimientos que mejoran y respetan la capacidad
+
+        best: boolean
+            Si es True escoge el de menor variacion, si no el primero en el
+            orden de recorrido del VND
+
+    Returns
+    -------
+        position: tuple
+            Indices (i, j) del movimiento escogido, o None si no hay ninguno valido
+
+    '''
+    if best:
+        flat = np.argmin(np.where(valid, change, np.inf))
+    else:
+        flat = np.argmax(valid)
+
+    if not valid.flat[flat]:
+        return None
+
+    i, j = np.unravel_index(flat, valid.shape)
+    return (int(i), int(j))
+
+def evaluated_moves(candidates, position, best):
+    '''
+    Cuenta los movimientos candidatos que recorreria intra_route_move o inter_route_move
+    hasta devolver el movimiento escogido, para que todos los motores cuenten igual
+
+    Parameters
+    ----------
+        candidates: numpy.ndarray
+            Mascara con los movimientos del vecindario que se recorren
+
+        position: tuple
+            Indices (i, j) del movimiento escogido, o None si no hay ninguno valido
+
+        best: boolean
+            Si es True se recorre todo el vecindario, si no hasta el primero que mejora
+
+    Returns
+    -------
+        evaluations: int
+            Movimientos candidatos evaluados
+
+    '''
+    if best or position is None:
+        return int(np.count_nonzero(candidates))
+
+    flat = np.ravel_multi_index(position, candidates.shape)
+    return int(np.count_nonzero(candidates.reshape(-1)[:flat + 1]))
+
+def intra_route_move_numpy(stops, rl, movement, instance, capacity, best=False):
+    '''
+    Version vectorizada de intra_route_move: evalua todo el vecindario de la ruta
+    con una sola operacion sobre la matriz de distancias y devuelve el mismo
+    movimiento que intra_route_move
+
+    Parameters
+    ----------
+        stops: list
+            Lista con las paradas de la ruta
+
+        rl: float
+            Longitud actual de la ruta
+
+        movement: funcion
+            Movimiento dentro de la misma ruta a probar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        best: boolean
+            Si es True devuelve el mejor movimiento, si no el primero que mejora
+
+    Returns
+    -------
+        move: tuple
+            Tupla (variacion, i, j) con el movimiento encontrado, o None si
+            ningun movimiento mejora la ruta
+
+        evaluations: int
+            Movimientos candidatos evaluados
+
+    '''
+    if movement not in NUMPY_DELTAS or len(stops) * (len(stops) - 1) < NUMPY_MIN_MOVES:
+        return intra_route_move(stops, rl, movement, instance, capacity, best)
+    if len(stops) < 2:
+        return None, 0
+
+    change = NUMPY_DELTAS[movement](stops, instance)
+    candidates = ~np.eye(len(stops), dtype=bool)
+    valid = (change < -IMPROVEMENT_EPSILON) & (rl + change < capacity) & candidates
+
+    position = select_move(change, valid, best)
+    evaluations = evaluated_moves(candidates, position, best)
+    if position is None:
+        return None, evaluations
+
+    i, j = position
+    return (float(change[i, j]), i, j), evaluations
+
+def inter_route_move_numpy(first_stops, second_stops, first_rl, second_rl, movement, instance, capacity, neighbours=None, best=False, looking=None, slacks=None):
+    '''
+    Version vectorizada de inter_route_move: evalua todo el vecindario del par de
+    rutas con una sola operacion sobre la matriz de distancias y devuelve el mismo
+    movimiento que inter_route_move
+
+    Parameters
+    ----------
+        first_stops: list
+            Lista con las paradas de la primera ruta
+
+        second_stops: list
+            Lista con las paradas de la segunda ruta
+
+        first_rl: float
+            Longitud actual de la primera ruta
+
+        second_rl: float
+            Longitud actual de la segunda ruta
+
+        movement: funcion
+            Movimiento entre distintas rutas a probar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular, o None
+            para probar todos los movimientos
+
+        best: boolean
+            Si es True devuelve el mejor movimiento, si no el primero que mejora
+
+        looking: set
+            Paradas de la primera ruta desde las que se prueban movimientos, o
+            None para probar desde todas
+
+        slacks: tuple
+            Carga que puede ganar cada una de las dos rutas, o None si no se tienen
+            en cuenta las demandas
+
+    Returns
+    -------
+        move: tuple
+            Tupla (variacion total, variacion de la primera ruta, variacion de la
+            segunda ruta, i, j) con el movimiento encontrado, o None si ningun
+            movimiento mejora las rutas
+
+        evaluations: int
+            Movimientos candidatos evaluados
+
+    '''
+    if movement not in NUMPY_DELTAS or len(first_stops) * len(second_stops) < NUMPY_MIN_MOVES:
+        return inter_route_move(first_stops, second_stops, first_rl, second_rl, movement, instance, capacity, neighbours, best, looking, slacks)
+    first_positions, second_positions = movement_positions(movement, first_stops, second_stops)
+    if first_positions == 0 or second_positions == 0:
+        return None, 0
+
+    first_change, second_change = NUMPY_DELTAS[movement](first_stops, second_stops, instance)
+    change = first_change + second_change
+    candidates = np.ones(change.shape, dtype=bool)
+
+    if neighbours is not None and movement in GRANULAR_CANDIDATES:
+        candidates[:] = False
+        granular = GRANULAR_CANDIDATES[movement](first_stops, second_stops, neighbours)
+        if granular:
+            rows, columns = zip(*granular)
+            candidates[list(rows), list(columns)] = True
+
+    if looking is not None:
+        candidates &= np.array(looked_positions(first_stops, first_positions, looking))[:, np.newaxis]
+
+    valid = (change < -IMPROVEMENT_EPSILON) & (first_rl + first_change < capacity) & (second_rl + second_change < capacity) & candidates
+
+    if slacks is not None:
+        first_load, second_load = NUMPY_LOADS[movement](first_stops, second_stops, instance)
+        valid &= (first_load <= slacks[0]) & (second_load <= slacks[1])
+
+    position = select_move(change, valid, best)
+    evaluations = evaluated_moves(candidates, position, best)
+    if position is None:
+        return None, evaluations
+
+    i, j = position
+    return (float(change[i, j]), float(first_change[i, j]), float(second_change[i, j]), i, j), evaluations
+
+def jit(function):
+    '''
+    Compila una funcion con Numba si esta instalado. Si no lo esta, la devuelve sin
+    cambios y el motor 'jit' del VND usa el recorrido en Python
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion sobre arrays de enteros y la matriz de distancias
+
+    Returns
+    -------
+        function: funcion
+            La funcion compilada, o la misma funcion si Numba no esta disponible
+
+    '''
+    if njit is None:
+        return function
+    return njit(cache=True)(function)
+
+# Las funciones compiladas reciben la ruta como array de enteros y la matriz de distancias
+# Cada distancia se convierte a float64 antes de operar y las sumas se hacen en el mismo
+# orden que en las funciones de Python, de modo que las variaciones son identicas
+
+@jit
+def edge(matrix, origin, dest):
+    '''
+    Distancia entre dos paradas como float64, sea cual sea el tipo de la matriz
+    Con Numba, float() mantiene un float32 en simple precision
+
+    Parameters
+    ----------
+        matrix: numpy.ndarray
+            Matriz de distancias de la instancia
+
+        origin: int
+            Parada de origen
+
+        dest: int
+            Parada de destino
+
+    Returns
+    -------
+        distance: float
+            Distancia entre las dos paradas
+    '''
+    return np.float64(matrix[origin, dest])
+
+@jit
+def prefix_lengths_kernel(route, matrix):
+    '''
+    Distancia recorrida desde el deposito hasta cada parada, con los mismos valores
+    que RoutePrefix.lengths
+
+    Parameters
+    ----------
+        route: numpy.ndarray
+            Array con las paradas de la ruta
+
+        matrix: numpy.ndarray
+            Matriz de distancias de la instancia
+
+    Returns
+    -------
+        lengths: numpy.ndarray
+            Array de len(route)+2 elementos. La posicion i+1 corresponde a la parada i
+            y la ultima al regreso al deposito
+    '''
+    lengths = np.zeros(len(route) + 2)
+    previous = DEPOT
+    for position in range(0, len(route) + 1):
+        stop = route[position] if position < len(route) else DEPOT
+        lengths[position + 1] = lengths[position] + edge(matrix, previous, stop)
+        previous = stop
+    return lengths
+
+@jit
+def prefix_loads_kernel(route, demands):
+    '''
+    Demanda acumulada de la ruta, con los mismos valores que RoutePrefix.loads
+
+    Parameters
+    ----------
+        route: numpy.ndarray
+            Array con las paradas de la ruta
+
+        demands: numpy.ndarray
+            Demanda de cada parada
+
+    Returns
+    -------
+        loads: numpy.ndarray
+            Array de len(route)+1 elementos con la demanda de las primeras i paradas
+    '''
+    loads = np.zeros(len(route) + 1, dtype=demands.dtype)
+    for position in range(0, len(route)):
+        loads[position + 1] = loads[position] + demands[route[position]]
+    return loads
+
+@jit
+def intra_swap_kernel(route, first_element, second_element, matrix):
+    '''
+    Version compilada de intra_swap_delta
+    '''
+    first, second = min(first_element, second_element), max(first_element, second_element)
+    u = route[first]
+    v = route[second]
+    prev_u = route[first-1] if first > 0 else DEPOT
+    next_v = route[second+1] if second + 1 < len(route) else DEPOT
+    if second == first + 1:
+        return (edge(matrix, prev_u, v) + edge(matrix, v, u) + edge(matrix, u, next_v)
+                - edge(matrix, prev_u, u) - edge(matrix, u, v) - edge(matrix, v, next_v))
+    next_u = route[first+1]
+    prev_v = route[second-1]
+    return (edge(matrix, prev_u, v) + edge(matrix, v, next_u) + edge(matrix, prev_v, u) + edge(matrix, u, next_v)
+            - edge(matrix, prev_u, u) - edge(matrix, u, next_u) - edge(matrix, prev_v, v) - edge(matrix, v, next_v))
+
+@jit
+def intra_shift_kernel(route, elem_index, shift_index, matrix):
+    '''
+    Version compilada de intra_shift_delta
+    '''
+    if elem_index == shift_index:
+        return 0.0
+    last = len(route) - 1
+    moved = route[shift_index]
+    prev_moved = route[shift_index-1] if shift_index > 0 else DEPOT
+    next_moved = route[shift_index+1] if shift_index < last else DEPOT
+    if elem_index < shift_index:
+        after = route[elem_index]
+        before = route[elem_index-1] if elem_index > 0 else DEPOT
+    else:
+        before = route[elem_index]
+        after = route[elem_index+1] if elem_index < last else DEPOT
+    return (edge(matrix, prev_moved, next_moved) + edge(matrix, before, moved) + edge(matrix, moved, after)
+            - edge(matrix, prev_moved, moved) - edge(matrix, moved, next_moved) - edge(matrix, before, after))
+
+@jit
+def intra_two_opt_kernel(route, first_element, second_element, matrix):
+    '''
+    Version compilada de intra_two_opt_delta
+    '''
+    first, second = min(first_element, second_element), max(first_element, second_element)
+    u = route[first]
+    v = route[second]
+    prev_u = route[first-1] if first > 0 else DEPOT
+    next_v = route[second+1] if second + 1 < len(route) else DEPOT
+    return edge(matrix, prev_u, v) + edge(matrix, u, next_v) - edge(matrix, prev_u, u) - edge(matrix, v, next_v)
+
+@jit
+def inter_swap_kernel(origin_route, dest_route, origin_lengths, dest_lengths, first_element, second_element, matrix):
+    '''
+    Version compilada de inter_swap_delta
+    '''
+    u = origin_route[first_element]
+    v = dest_route[second_element]
+    prev_u = origin_route[first_element-1] if first_element > 0 else DEPOT
+    next_u = origin_route[first_element+1] if first_element + 1 < len(origin_route) else DEPOT
+    prev_v = dest_route[second_element-1] if second_element > 0 else DEPOT
+    next_v = dest_route[second_element+1] if second_element + 1 < len(dest_route) else DEPOT
+    origin_delta = edge(matrix, prev_u, v) + edge(matrix, v, next_u) - edge(matrix, prev_u, u) - edge(matrix, u, next_u)
+    dest_delta = edge(matrix, prev_v, u) + edge(matrix, u, next_v) - edge(matrix, prev_v, v) - edge(matrix, v, next_v)
+    return (origin_delta, dest_delta)
+
+@jit
+def inter_shift_kernel(origin_route, dest_route, origin_lengths, dest_lengths, elem_index, shift_index, matrix):
+    '''
+    Version compilada de inter_shift_delta
+    '''
+    u = origin_route[elem_index]
+    prev_u = origin_route[elem_index-1] if elem_index > 0 else DEPOT
+    next_u = origin_route[elem_index+1] if elem_index + 1 < len(origin_route) else DEPOT
+    before = dest_route[shift_index-1] if shift_index > 0 else DEPOT
+    after = dest_route[shift_index] if shift_index < len(dest_route) else DEPOT
+    origin_delta = edge(matrix, prev_u, next_u) - edge(matrix, prev_u, u) - edge(matrix, u, next_u)
+    dest_delta = edge(matrix, before, u) + edge(matrix, u, after) - edge(matrix, before, after)
+    return (origin_delta, dest_delta)
+
+@jit
+def inter_two_opt_star_kernel(origin_route, dest_route, origin_lengths, dest_lengths, first_element, second_element, matrix):
+    '''
+    Version compilada de inter_two_opt_star_delta. La longitud de cada final se obtiene
+    de las distancias acumuladas de la ruta, como en route_tail_length
+    '''
+    u = origin_route[first_element - 1] if first_element > 0 else DEPOT
+    v = dest_route[second_element - 1] if second_element > 0 else DEPOT
+    next_u = origin_route[first_element] if first_element < len(origin_route) else DEPOT
+    next_v = dest_route[second_element] if second_element < len(dest_route) else DEPOT
+    origin_tail = origin_lengths[-1] - origin_lengths[first_element + 1]
+    dest_tail = dest_lengths[-1] - dest_lengths[second_element + 1]
+    origin_delta = edge(matrix, u, next_v) + dest_tail - edge(matrix, u, next_u) - origin_tail
+    dest_delta = edge(matrix, v, next_u) + origin_tail - edge(matrix, v, next_v) - dest_tail
+    return (origin_delta, dest_delta)
+
+@jit
+def inter_swap_load_kernel(origin_loads, dest_loads, first_element, second_element):
+    '''
+    Version compilada de inter_swap_load sobre las demandas acumuladas de las rutas
+    '''
+    change = (dest_loads[second_element + 1] - dest_loads[second_element]) - (origin_loads[first_element + 1] - origin_loads[first_element])
+    return (change, -change)
+
+@jit
+def inter_shift_load_kernel(origin_loads, dest_loads, elem_index, shift_index):
+    '''
+    Version compilada de inter_shift_load sobre las demandas acumuladas de las rutas
+    '''
+    moved = origin_loads[elem_index + 1] - origin_loads[elem_index]
+    return (-moved, moved)
+
+@jit
+def inter_two_opt_star_load_kernel(origin_loads, dest_loads, first_element, second_element):
+    '''
+    Version compilada de inter_two_opt_star_load sobre las demandas acumuladas de las rutas
+    '''
+    change = ((dest_loads[-1] - dest_loads[second_element])
+              - (origin_loads[-1] - origin_loads[first_element]))
+    return (change, -change)
+
+def intra_scan_kernel(delta):
+    '''
+    Crea la funcion compilada que recorre los pares de paradas de una ruta en el
+    mismo orden que intra_route_move. Se crea una por movimiento para que Numba
+    compile la variacion de longitud dentro del recorrido
+
+    Parameters
+    ----------
+        delta: funcion
+            Variacion de longitud compilada del movimiento
+
+    Returns
+    -------
+        scan: funcion
+            Funcion scan(route, matrix, rl, capacity, best) que recibe la ruta como
+            array de enteros, la matriz de distancias, la longitud actual de la ruta,
+            la capacidad maxima y si se busca el mejor movimiento, y devuelve la tupla
+            (encontrado, variacion, i, j, evaluaciones)
+
+    '''
+    @jit
+    def scan(route, matrix, rl, capacity, best):
+        found, best_change, best_i, best_j = False, 0.0, 0, 0
+        evaluations = 0
+        for i in range(0, len(route)):
+            for j in range(0, len(route)):
+                if i == j:
+                    continue
+                evaluations += 1
+                change = delta(route, i, j, matrix)
+                if change < -IMPROVEMENT_EPSILON and rl + change < capacity:
+                    if not best:
+                        return (True, change, i, j, evaluations)
+                    if not found or change < best_change:
+                        found, best_change, best_i, best_j = True, change, i, j
+        return (found, best_change, best_i, best_j, evaluations)
+
+    return scan
+
+def inter_scan_kernel(delta, load, extra=0):
+    '''
+    Crea la funcion compilada que recorre los pares de paradas de dos rutas en el
+    mismo orden que inter_route_move. Se crea una por movimiento para que Numba
+    compile la variacion de longitud y de carga dentro del recorrido
+
+    Parameters
+    ----------
+        delta: funcion
+            Variacion de longitud compilada del movimiento
+
+        load: funcion
+            Variacion de carga compilada del movimiento
+
+        extra: int
+            Posiciones que el movimiento prueba en cada ruta ademas de una por parada,
+            como en MOVEMENT_POSITIONS
+
+    Returns
+    -------
+        scan: funcion
+            Funcion scan(first, second, pairs, full, origins, matrix, first_rl, second_rl,
+            capacity, best, first_loads, second_loads, slacks). Si full es True prueba
+            todos los pares desde las posiciones de la primera ruta marcadas en origins, y
+            si no los pares (i, j) de pairs en orden. La carga solo se comprueba si
+            slacks no esta vacio. Devuelve la tupla (encontrado, variacion total,
+            variacion de la primera ruta, variacion de la segunda ruta, i, j, evaluaciones)
+
+    '''
+    @jit
+    def scan(first, second, pairs, full, origins, matrix, first_rl, second_rl, capacity, best,
+             first_loads, second_loads, slacks):
+        first_lengths = prefix_lengths_kernel(first, matrix)
+        second_lengths = prefix_lengths_kernel(second, matrix)
+        found, best_change, best_first, best_second, best_i, best_j = False, 0.0, 0.0, 0.0, 0, 0
+        evaluations = 0
+        columns = len(second) + extra
+        total = (len(first) + extra) * columns if full else len(pairs)
+        for candidate in range(0, total):
+            if full:
+                i, j = candidate // columns, candidate % columns
+                if not origins[i]:
+                    continue
+            else:
+                i, j = pairs[candidate, 0], pairs[candidate, 1]
+            evaluations += 1
+            first_change, second_change = delta(first, second, first_lengths, second_lengths, i, j, matrix)
+            change = first_change + second_change
+
+            if change < -IMPROVEMENT_EPSILON and first_rl + first_change < capacity and second_rl + second_change < capacity:
+                # Como en inter_route_move, la carga solo se comprueba en los movimientos que ya mejoran
+                if len(slacks) > 0:
+                    first_load, second_load = load(first_loads, second_loads, i, j)
+                    if first_load > slacks[0] or second_load > slacks[1]:
+                        continue
+                if not best:
+                    return (True, change, first_change, second_change, i, j, evaluations)
+                if not found or change < best_change:
+                    found, best_change, best_first, best_second, best_i, best_j = True, change, first_change, second_change, i, j
+        return (found, best_change, best_first, best_second, best_i, best_j, evaluations)
+
+    return scan
+
+# Recorrido compilado del vecindario de cada movimiento para el motor 'jit'
+JIT_SCANS = {
+    intra_swap: intra_scan_kernel(intra_swap_kernel),
+    intra_shift: intra_scan_kernel(intra_shift_kernel),
+    intra_two_opt: intra_scan_kernel(intra_two_opt_kernel),
+    inter_swap: inter_scan_kernel(inter_swap_kernel, inter_swap_load_kernel),
+    inter_shift: inter_scan_kernel(inter_shift_kernel, inter_shift_load_kernel),
+    inter_two_opt_star: inter_scan_kernel(inter_two_opt_star_kernel, inter_two_opt_star_load_kernel, MOVEMENT_POSITIONS[inter_two_opt_star][0]),
+}
+
+def intra_route_move_jit(stops, rl, movement, instance, capacity, best=False):
+    '''
+    Version compilada de intra_route_move: recorre el vecindario de la ruta como array
+    de enteros sobre la matriz de distancias y devuelve el mismo movimiento que
+    intra_route_move
+
+    Parameters
+    ----------
+        stops: list
+            Lista con las paradas de la ruta
+
+        rl: float
+            Longitud actual de la ruta
+
+        movement: funcion
+            Movimiento dentro de la misma ruta a probar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        best: boolean
+            Si es True devuelve el mejor movimiento, si no el primero que mejora
+
+    Returns
+    -------
+        move: tuple
+            Tupla (variacion, i, j) con el movimiento encontrado, o None si
+            ningun movimiento mejora la ruta
+
+        evaluations: int
+            Movimientos candidatos evaluados
+
+    '''
+    if movement not in JIT_SCANS:
+        return intra_route_move(stops, rl, movement, instance, capacity, best)
+
+    found, change, i, j, evaluations = JIT_SCANS[movement](np.array(stops, dtype=np.int64), np.asarray(instance.matrix), float(rl), float(capacity), best)
+    if not found:
+        return None, int(evaluations)
+    return (change, int(i), int(j)), int(evaluations)
+
+def inter_route_move_jit(first_stops, second_stops, first_rl, second_rl, movement, instance, capacity, neighbours=None, best=False, looking=None, slacks=None):
+    '''
+    Version compilada de inter_route_move: recorre el vecindario del par de rutas
+    como arrays de enteros sobre la matriz de distancias y devuelve el mismo
+    movimiento que inter_route_move
+
+    Parameters
+    ----------
+        first_stops: list
+            Lista con las paradas de la primera ruta
+
+        second_stops: list
+            Lista con las paradas de la segunda ruta
+
+        first_rl: float
+            Longitud actual de la primera ruta
+
+        second_rl: float
+            Longitud actual de la segunda ruta
+
+        movement: funcion
+            Movimiento entre distintas rutas a probar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular, o None
+            para probar todos los movimientos
+
+        best: boolean
+            Si es True devuelve el mejor movimiento, si no el primero que mejora
+
+        looking: set
+            Paradas de la primera ruta desde las que se prueban movimientos, o
+            None para probar desde todas
+
+        slacks: tuple
+            Carga que puede ganar cada una de las dos rutas, o None si no se tienen
+            en cuenta las demandas
+
+    Returns
+    -------
+        move: tuple
+            Tupla (variacion total, variacion de la primera ruta, variacion de la
+            segunda ruta, i, j) con el movimiento encontrado, o None si ningun
+            movimiento mejora las rutas
+
+        evaluations: int
+            Movimientos candidatos evaluados
+
+    '''
+    if movement not in JIT_SCANS:
+        return inter_route_move(first_stops, second_stops, first_rl, second_rl, movement, instance, capacity, neighbours, best, looking, slacks)
+
+    first, second = np.array(first_stops, dtype=np.int64), np.array(second_stops, dtype=np.int64)
+    first_positions = movement_positions(movement, first_stops, second_stops)[0]
+    looked = None if looking is None else looked_positions(first_stops, first_positions, looking)
+    full = neighbours is None or movement not in GRANULAR_CANDIDATES
+    if full:
+        pairs = np.zeros((0, 2), dtype=np.int64)
+        origins = np.ones(first_positions, dtype=np.bool_) if looking is None else np.array(looked, dtype=np.bool_)
+    else:
+        candidates = GRANULAR_CANDIDATES[movement](first_stops, second_stops, neighbours)
+        if looking is not None:
+            candidates = [(i, j) for i, j in candidates if looked[i]]
+        pairs = np.array(candidates, dtype=np.int64).reshape(-1, 2)
+        origins = np.zeros(0, dtype=np.bool_)
+
+    demands = instance.demands
+    if slacks is None:
+        first_loads, second_loads, slacks = np.zeros(1, dtype=demands.dtype), np.zeros(1, dtype=demands.dtype), np.zeros(0, dtype=demands.dtype)
+    else:
+        first_loads, second_loads = prefix_loads_kernel(first, demands), prefix_loads_kernel(second, demands)
+        slacks = np.array(slacks, dtype=demands.dtype)
+
+    found, change, first_change, second_change, i, j, evaluations = JIT_SCANS[movement](
+        first, second, pairs, full, origins, np.asarray(instance.matrix), float(first_rl), float(second_rl),
+        float(capacity), best, first_loads, second_loads, slacks)
+    if not found:
+        return None, int(evaluations)
+    return (change, first_change, second_change, int(i), int(j)), int(evaluations)
+
+# Funciones que recorren el vecindario de una ruta y de un par de rutas en cada motor del VND
+SCAN_ENGINES = {
+    'python': (intra_route_move, inter_route_move),
+    'numpy': (intra_route_move_numpy, inter_route_move_numpy),
+    # Sin Numba el motor 'jit' recorre los vecindarios en Python, con los mismos resultados
+    'jit': (intra_route_move_jit, inter_route_move_jit) if njit is not None else (intra_route_move, inter_route_move),
+}
+
+def apply_move(solution, movement, routes, move, instance):
+    '''
+    Aplica a la solucion un movimiento encontrado por intra_route_move o inter_route_move
+
+    Parameters
+    ----------
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
+
+        movement: funcion
+            Movimiento a aplicar
+
+        routes: tuple
+            Indice de la ruta, o de las dos rutas, a las que afecta el movimiento
+
+        move: tuple
+            Movimiento devuelto por intra_route_move o inter_route_move
+
+        instance: Instance
+            Instancia del problema con las demandas de las paradas
+
+    '''
+    if len(routes) == 1:
+        change, i, j = move
+        solution.update_route(routes[0], movement(solution.stops[routes[0]], i, j), change)
+    else:
+        change, first_change, second_change, i, j = move
+        first_index, second_index = routes
+        first_stops, second_stops = solution.stops[first_index], solution.stops[second_index]
+        first_load, second_load = MOVEMENT_LOADS[movement](instance.route_prefix(first_stops), instance.route_prefix(second_stops), i, j, instance)
+        new_first_stops, new_second_stops = movement(first_stops, second_stops, i, j)
+        solution.update_route(first_index, new_first_stops, first_change, first_load)
+        solution.update_route(second_index, new_second_stops, second_change, second_load)
+
+def scan_move(solution, instance, capacity, movement, routes, neighbours=None, best=False, engine='python', budget=None, stats=None):
+    '''
+    Busca un movimiento que mejore las rutas indicadas de la solucion
+    Si la unidad ya se recorrio sin mejora y sus rutas no han cambiado, no se
+    vuelve a recorrer; si se recorre sin mejora, se anota en la solucion
+
+    Parameters
+    ----------
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        movement: funcion
+            Movimiento a probar
+
+        routes: tuple
+            Indice de la ruta, para movimientos dentro de una ruta, o de las
+            dos rutas, para movimientos entre rutas
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular
+
+        best: boolean
+            Si es True devuelve el mejor movimiento, si no el primero que mejora
+
+        engine: string
+            Motor con el que se recorre el vecindario: 'python', 'numpy' o 'jit'
+
+        budget: Budget
+            Limite de tiempo y de evaluaciones. Si esta agotado no se recorre el
+            vecindario y se devuelve None, sin marcar la unidad como agotada. Si no,
+            se le anotan los movimientos candidatos evaluados en el recorrido
+
+        stats: Stats
+            Contadores donde se anotan las evaluaciones y el tiempo del recorrido
+
+    Returns
+    -------
+        move: tuple
+            Movimiento encontrado, o None si ninguno mejora las rutas
+
+    '''
+    stops = solution.stops
+    state = tuple(stops[index] for index in routes)
+    if solution.exhausted.get((movement, routes)) == state:
+        return None
+
+    if budget is not None and budget.exhausted():
+        return None
+    if stats is not None:
+        start = perf_counter()
+
+    intra_scan, inter_scan = SCAN_ENGINES[engine]
+    if len(routes) == 1:
+        move, evaluations = intra_scan(stops[routes[0]], solution.lengths[routes[0]], movement, instance, capacity, best)
+    else:
+        first_index, second_index = routes
+        slacks = None if solution.load_capacity is None else (solution.load_slack(first_index), solution.load_slack(second_index))
+        move, evaluations = inter_scan(stops[first_index], stops[second_index], solution.lengths[first_index],
+                                       solution.lengths[second_index], movement, instance, capacity, neighbours, best, solution.looking, slacks)
+
+    if budget is not None:
+        budget.spend(evaluations)
+    if stats is not None:
+        stats.record_scan(movement, evaluations, perf_counter() - start)
+
+    if move is None:
+        solution.mark_exhausted((movement, routes), state)
+
+    return move
+
+def VND_movement(solution, instance, capacity, inter_movements, intra_movements, neighbours=None, engine='python', budget=None, stats=None):
+    '''
+    Realiza un movimiento en varios vecindarios que mejore la solucion actual
+    La solucion se modifica directamente, sin copiarla
+
+    Parameters
+    ----------
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        inter_movements: list
+            Lista con los moviminentos entre distintas rutas que puede realizar
+
+        intra_movements: list
+            Lista con los movimientos dentro de la misma ruta que puede realizar
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada. Si se indican, entre rutas solo se
+            prueban los movimientos que dejan una parada junto a uno de sus vecinos
+
+        engine: string
+            Motor con el que se recorre cada vecindario: 'python', 'numpy' o 'jit'
+
+        budget: Budget
+            Limite de tiempo y de evaluaciones, o None para no limitar la busqueda
+
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
+
+    Returns
+    -------
+        improvement: boolean
+            True si se ha aplicado un movimiento que mejora la solucion,
+            False en caso contrario
+
+    '''
+    shuffle(inter_movements)
+    shuffle(intra_movements)
+
+    for movement, routes in scan_units(len(solution.stops), inter_movements, intra_movements):
+        move = scan_move(solution, instance, capacity, movement, routes, neighbours, engine=engine, budget=budget, stats=stats)
+        if move is not None:
+            apply_move(solution, movement, routes, move, instance)
+            if stats is not None:
+                stats.record_move(movement)
+            return True
+
+    return False
+
+def scan_units(size, inter_movements, intra_movements):
+    '''
+    Genera las unidades de busqueda del VND en el orden en que se recorren:
+    primero cada ruta con cada movimiento interno y despues cada par ordenado
+    de rutas con cada movimiento entre rutas
+
+    Parameters
+    ----------
+        size: int
+            Numero de rutas de la solucion
+
+        inter_movements: list
+            Lista con los moviminentos entre distintas rutas que puede realizar
+
+        intra_movements: list
+            Lista con los movimientos dentro de la misma ruta que puede realizar
+
+    Returns
+    -------
+        units: list
+            Lista de tuplas (movimiento, indices de las rutas)
+
+    '''
+    units = [(movement, (index,)) for index in range(0, size) for movement in intra_movements]
+    units.extend((movement, pair) for pair in permutations(range(0, size), 2) for movement in inter_movements)
+    return units
+
+def VND_first(solution, instance, capacity, inter_movements, intra_movements, neighbours=None, engine='python', budget=None, stats=None):
+    '''
+    VND de primera mejora que vuelve a empezar desde la primera ruta tras cada movimiento
+    La solucion se modifica directamente
+
+    Parameters
+    ----------
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        inter_movements: list
+            Lista con los moviminentos entre distintas rutas que puede realizar
+
+        intra_movements: list
+            Lista con los movimientos dentro de la misma ruta que puede realizar
 
-    Returns
-    -------
-        (new_origin_route, new_dest_route): tuple
-            Tupla con las listas de las paradas de las rutas despues
-            del intercambio
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular
 
-    '''
-    new_origin_route = origin_route[:]
-    new_dest_route = dest_route[:]
+        engine: string
+            Motor con el que se recorre cada vecindario: 'python', 'numpy' o 'jit'
 
-    new_dest_route.insert(shift_index, new_origin_route.pop(elem_index))
+        budget: Budget
+            Limite de tiempo y de evaluaciones, o None para no limitar la busqueda
 
-    return (new_origin_route, new_dest_route)
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
 
-def sequence_exchange(origin_route, dest_route, first_element, second_element, sequence_length):
     '''
-    Intercambia una secuencia de elementos de distintas rutas
+    while VND_movement(solution, instance, capacity, inter_movements, intra_movements, neighbours, engine, budget, stats):
+        pass
+
+def VND_resume(solution, instance, capacity, inter_movements, intra_movements, neighbours=None, engine='python', budget=None, stats=None):
+    '''
+    VND de primera mejora que continua la busqueda desde donde encontro el ultimo
+    movimiento en lugar de volver a empezar
+    La solucion se modifica directamente
 
     Parameters
     ----------
-        origin_route: list
-            Lista con las paradas de la ruta de origen
-        
-        dest_route: list
-            Lista con las paradas de la ruta de destino
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        first_element: int
-            Indice del primer elemento de la ruta de origen
-        
-        second_element: int
-            Indice del primer elemento de la ruta de destino
-        
-        sequence_length: int
-            Longitud de la secuencia a intercambiar
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
-    Returns
-    -------
-        (new_origin_route, new_dest_route): tuple
-            Tupla con las listas de las paradas de las rutas despues
-            del intercambio
+        capacity: int
+            Capacidad maxima de los camiones
+
+        inter_movements: list
+            Lista con los moviminentos entre distintas rutas que puede realizar
+
+        intra_movements: list
+            Lista con los movimientos dentro de la misma ruta que puede realizar
+
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular
+
+        engine: string
+            Motor con el que se recorre cada vecindario: 'python', 'numpy' o 'jit'
+
+        budget: Budget
+            Limite de tiempo y de evaluaciones, o None para no limitar la busqueda
+
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
 
     '''
-    new_origin_route = origin_route[:]
-    new_dest_route = dest_route[:]
+    shuffle(inter_movements)
+    shuffle(intra_movements)
+    units = scan_units(len(solution.stops), inter_movements, intra_movements)
+    position = 0
+    idle = 0
 
-    for i in range(0, sequence_length):
-        new_origin_route, new_dest_route = inter_swap(new_origin_route, new_dest_route, first_element + i, second_element + i)
-    
-    return (new_origin_route, new_dest_route)
+    while idle < len(units):
+        movement, routes = units[position]
+        move = scan_move(solution, instance, capacity, movement, routes, neighbours, engine=engine, budget=budget, stats=stats)
+
+        if move is None:
+            position = (position + 1) % len(units)
+            idle += 1
+        else:
+            # Se sigue en la misma unidad, que puede admitir mas mejoras
+            apply_move(solution, movement, routes, move, instance)
+            if stats is not None:
+                stats.record_move(movement)
+            idle = 0
 
-def VND_movement(routes, coord_map, capacity, inter_movements, intra_movements):
+def VND_best(solution, instance, capacity, inter_movements, intra_movements, neighbours=None, engine='python', budget=None, stats=None):
     '''
-    Realiza un movimiento en varios vecindarios que mejore la solucion actual
+    VND de mejor mejora: en cada vecindario aplica el mejor movimiento de todas las
+    rutas y vuelve al primer vecindario, o pasa al siguiente si no hay mejora.
+    El mejor movimiento de cada ruta o par de rutas se guarda y solo se recalcula
+    cuando alguna de sus rutas cambia
+    La solucion se modifica directamente
 
     Parameters
     ----------
-        routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
-        
+
         inter_movements: list
             Lista con los moviminentos entre distintas rutas que puede realizar
 
         intra_movements: list
             Lista con los movimientos dentro de la misma ruta que puede realizar
 
-    Returns
-    -------
-        new_routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
-            despues de mejorar
-        
-        improvement: boolean
-            En caso de no mejorar devuelve False
-
-    '''
-    new_routes = deepcopy(routes)
-    shuffle(inter_movements)
-    shuffle(intra_movements)
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular
 
-    for route in new_routes:
-        rl = route_length(route['stops'], coord_map)
-
-        for movement in intra_movements:
-            # For each pair of elements in the same route
-            for i, j in permutations(range(0,len(route['stops'])), 2):
-                new_route = movement(route['stops'], i, j)
-                if (route_length(new_route, coord_map) < rl) and validate_route(new_route,capacity, coord_map):
-                    route['stops'] = new_route
-                    return new_routes
-            
-    
-    for first_route, second_route in permutations(new_routes, 2):
-        rl = route_length(first_route['stops'], coord_map) + route_length(second_route['stops'], coord_map) 
+        engine: string
+            Motor con el que se recorre cada vecindario: 'python', 'numpy' o 'jit'
 
-        for movement in inter_movements:
-            # For each pair of elements of the two routes selected
-            for i, j in product(range(0, len(first_route['stops'])), range(0,len(second_route['stops']))):
-                new_first_route, new_second_route = movement(first_route['stops'], second_route['stops'], i, j)
+        budget: Budget
+            Limite de tiempo y de evaluaciones, o None para no limitar la busqueda
 
-                if (route_length(new_first_route, coord_map) + route_length(new_second_route, coord_map) < rl) and validate_route(new_first_route,capacity, coord_map) and validate_route(new_second_route,capacity, coord_map):
-                    improvement = True
-                    first_route['stops'] = new_first_route
-                    second_route['stops'] = new_second_route
-                    return new_routes
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
 
-    return False
+    '''
+    shuffle(inter_movements)
+    shuffle(intra_movements)
+    size = len(solution.stops)
+    neighbourhoods = [(movement, [(index,) for index in range(0, size)]) for movement in intra_movements]
+    neighbourhoods.extend((movement, list(permutations(range(0, size), 2))) for movement in inter_movements)
+    # Mejor movimiento de cada unidad junto con las rutas que tenia al calcularlo
+    cache = {}
+    level = 0
+
+    while level < len(neighbourhoods):
+        movement, units = neighbourhoods[level]
+        best_move = None
+        best_routes = None
+
+        for routes in units:
+            state = tuple(solution.stops[index] for index in routes)
+            cached = cache.get((movement, routes))
+            if cached is not None and cached[0] == state:
+                move = cached[1]
+            else:
+                move = scan_move(solution, instance, capacity, movement, routes, neighbours, best=True, engine=engine, budget=budget, stats=stats)
+                cache[(movement, routes)] = (state, move)
 
+            if move is not None and (best_move is None or move[0] < best_move[0]):
+                best_move = move
+                best_routes = routes
 
-def VND(routes, coord_map, capacity, inter_movements, intra_movements):
+        if best_move is None:
+            level += 1
+        else:
+            apply_move(solution, movement, best_routes, best_move, instance)
+            if stats is not None:
+                stats.record_move(movement)
+            level = 0
+
+# Estrategias de busqueda local disponibles en VND
+VND_STRATEGIES = {
+    'first': VND_first,
+    'resume': VND_resume,
+    'best': VND_best,
+}
+
+def VND(solution, instance, capacity, inter_movements, intra_movements, neighbours=None, strategy='first', engine='python', budget=None, stats=None):
     '''
     Realiza movimientos en varios vecindarios mientras mejoren la solucion actual
+    Las unidades de busqueda que la solucion tiene marcadas como agotadas no se
+    recorren mientras sus rutas no cambien, por lo que tras un shake solo se
+    examinan las rutas que este ha modificado. Estas marcas suponen que el VND
+    se llama siempre con la misma capacidad y los mismos vecindarios
 
     Parameters
     ----------
-        routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
-        
+
         inter_movements: list
             Lista con los moviminentos entre distintas rutas que puede realizar
 
         intra_movements: list
             Lista con los movimientos dentro de la misma ruta que puede realizar
 
+        neighbours: list
+            Vecinos mas cercanos de cada parada para el vecindario granular, o None
+            para probar todos los movimientos
+
+        strategy: string
+            Estrategia de busqueda: 'first' aplica el primer movimiento que mejora y
+            vuelve a empezar, 'resume' aplica el primero y continua desde ese punto,
+            y 'best' aplica el mejor movimiento de cada vecindario
+
+        engine: string
+            Motor con el que se recorre cada vecindario: 'python' evalua los movimientos
+            uno a uno y 'numpy' evalua todo el vecindario de una ruta o de un par de
+            rutas con operaciones vectorizadas. Ambos encuentran los mismos movimientos
+
+        budget: Budget
+            Limite de tiempo y de evaluaciones. Si se agota, el VND termina y devuelve
+            la solucion mejorada hasta ese momento
+
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
+
     Returns
     -------
-        improvement: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
-            despues de mejorar. En caso de no mejorar, devuelve las rutas originales
+        new_solution: Solution
+            Copia de la solucion con las rutas que hace cada camion despues de
+            mejorar. En caso de no mejorar, tiene las mismas rutas que la original
     '''
 
-    improvement = VND_movement(routes, coord_map, capacity, inter_movements, intra_movements)
-    if not improvement:
-        return routes
-    while improvement:
-        proposal = VND_movement(improvement, coord_map, capacity, inter_movements, intra_movements)
-        if proposal:
-            improvement = proposal
-        else:
-            return improvement
+    new_solution = solution.copy()
+    VND_STRATEGIES[strategy](new_solution, instance, capacity, inter_movements, intra_movements, neighbours, engine, budget, stats)
+    if new_solution.looking is not None:
+        # En un optimo local se activan todos los bits "don't look"
+        new_solution.looking = set()
+
+    return new_solution
 
-def MC2(routes, coord_map, capacity):
+def MC2(solution, instance, capacity, stats=None):
     '''
     Realiza dos movimientos aleatorios que generen una serie de rutas validas
 
     Parameters
     ----------
-        routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
 
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
+
 
     Returns
     -------
-        new_routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        new_solution: Solution
+            Rutas que hace cada camion, y el camion que las realiza,
             despues de realizar los movimientos
 
     '''
-    new_routes = deepcopy(routes)
+    new_solution = solution.copy()
+    new_routes = new_solution.stops
+    lengths = new_solution.lengths
     intra_movements = [intra_swap, intra_shift]
     inter_movements = [inter_swap, inter_shift]
     attempts = 0
@@ -433,11 +3785,11 @@ def MC2(routes, coord_map, capacity):
                 route_index = randint(0,len(new_routes)-1)
                 route = new_routes[route_index]
 
-                while len(route['stops']) < 2:
+                while len(route) < 2:
                     route_index = randint(0,len(new_routes)-1)
                     route = new_routes[route_index]
 
-                rl = len(route['stops'])-1
+                rl = len(route)-1
 
                 first_index = randint(0,rl)
                 second_index = randint(0,rl)
@@ -445,199 +3797,282 @@ def MC2(routes, coord_map, capacity):
                 while first_index == second_index:
                     second_index = randint(0,rl)
 
-                new_route = intra_movements[movement](route['stops'], first_index, second_index)
-                valid_route = validate_route(new_route,capacity, coord_map)
+                change = MOVEMENT_DELTAS[intra_movements[movement]](route, first_index, second_index, instance)
+                valid_route = lengths[route_index] + change < capacity
 
                 if valid_route:
-                    route['stops'] = new_route
+                    new_route = intra_movements[movement](route, first_index, second_index)
+                    new_solution.update_route(route_index, new_route, change)
                     # No se pueden realizar dos movimientos iguales
                     intra_movements.pop(movement)
-            
+
             else:
                 movement = randint(0,len(inter_movements)-1)
                 origin_route_index = randint(0,len(new_routes)-1)
                 origin_route = new_routes[origin_route_index]
 
-                while len(origin_route['stops']) < 1:
+                while len(origin_route) < 1:
                     origin_route_index = randint(0,len(new_routes)-1)
                     origin_route = new_routes[origin_route_index]
 
                 dest_route_index = randint(0,len(new_routes)-1)
                 dest_route = new_routes[dest_route_index]
 
-                while origin_route_index == dest_route_index or len(dest_route['stops']) < 1:
+                while origin_route_index == dest_route_index or len(dest_route) < 1:
                     dest_route_index = randint(0,len(new_routes)-1)
                     dest_route = new_routes[dest_route_index]
 
-                origin_rl = len(origin_route['stops'])-1
-                dest_rl = len(dest_route['stops'])-1
+                origin_rl = len(origin_route)-1
+                dest_rl = len(dest_route)-1
 
                 first_index = randint(0,origin_rl)
                 second_index = randint(0,dest_rl)
 
-                new_origin_route, new_dest_route = inter_movements[movement](origin_route['stops'], dest_route['stops'], first_index, second_index)
-                valid_route = validate_route(new_origin_route,capacity, coord_map) and validate_route(new_dest_route,capacity, coord_map) 
+                origin_change, dest_change = MOVEMENT_DELTAS[inter_movements[movement]](origin_route, dest_route, first_index, second_index, instance)
+                valid_route = lengths[origin_route_index] + origin_change < capacity and lengths[dest_route_index] + dest_change < capacity
+                # Las cargas solo se calculan para los movimientos que caben en la distancia, y
+                # sin limite de carga no se comprueban, pero se siguen actualizando
+                if valid_route:
+                    origin_load, dest_load = MOVEMENT_LOADS[inter_movements[movement]](new_solution.prefix(origin_route_index, instance),
+                                                                                       new_solution.prefix(dest_route_index, instance),
+                                                                                       first_index, second_index, instance)
+                    if new_solution.load_capacity is not None:
+                        valid_route = origin_load <= new_solution.load_slack(origin_route_index) and dest_load <= new_solution.load_slack(dest_route_index)
 
                 if valid_route:
-                    origin_route['stops'], dest_route['stops'] = new_origin_route, new_dest_route
+                    new_origin_route, new_dest_route = inter_movements[movement](origin_route, dest_route, first_index, second_index)
+                    new_solution.update_route(origin_route_index, new_origin_route, origin_change, origin_load)
+                    new_solution.update_route(dest_route_index, new_dest_route, dest_change, dest_load)
                     # No se pueden realizar dos movimientos iguales
                     inter_movements.pop(movement)
-    
-    return new_routes
 
+    if stats is not None:
+        stats.record_shake('MC2', attempts, valid_route)
+
+    return new_solution
 
-def SE_MOVEMENT(routes, coord_map, capacity, sequence_length):
+
+def SE_MOVEMENT(solution, instance, capacity, sequence_length, stats=None):
     '''
     Realiza un intercambio de secuencia
 
     Parameters
     ----------
-        routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
-        
+
         sequence_length: int
             Longitud de la secuencia a intercambiar
 
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
+
     Returns
     -------
-        new_routes: dict
-            Diccionario con las rutas que hace cada camion despues de intercambiar la secuencia
+        new_solution: Solution
+            Rutas que hace cada camion despues de intercambiar la secuencia
 
     '''
-    new_routes = deepcopy(routes)
+    new_solution = solution.copy()
+    new_routes = new_solution.stops
     valid_route = False
     attempts = 0
 
+    # Con secuencias largas puede que no haya dos rutas donde quepan, y no se podria escoger ninguna
+    if sum(1 for route in new_routes if len(route) > sequence_length) < 2:
+        if stats is not None:
+            stats.record_shake(f'SE{sequence_length}', attempts, valid_route)
+        return new_solution
+
     # Limitamos los intentos a un maximo, ya que dependiendo de otros factores puede tardar demasiado en converger
     while not valid_route and attempts < MAX_ATTEMPTS:
         attempts += 1
         origin_route_index = randint(0,len(new_routes)-1)
         origin_route = new_routes[origin_route_index]
 
-        while len(origin_route['stops']) <= sequence_length:
+        while len(origin_route) <= sequence_length:
             origin_route_index = randint(0,len(new_routes)-1)
             origin_route = new_routes[origin_route_index]
 
         dest_route_index = randint(0,len(new_routes)-1)
         dest_route = new_routes[dest_route_index]
 
-        while origin_route_index == dest_route_index or len(dest_route['stops']) <= sequence_length:
+        while origin_route_index == dest_route_index or len(dest_route) <= sequence_length:
             dest_route_index = randint(0,len(new_routes)-1)
             dest_route = new_routes[dest_route_index]
 
         # La parada que se puede escoger como origen tiene que permitir que se intercambie toda la secuencia
-        origin_rl = len(origin_route['stops']) - 1 - sequence_length
-        dest_rl = len(dest_route['stops']) - 1 - sequence_length
+        origin_rl = len(origin_route) - 1 - sequence_length
+        dest_rl = len(dest_route) - 1 - sequence_length
 
         # Si la ruta tiene tantos elementos como la secuencia, el indice debe ser 0 forzosamente
         # En caso contrario, es aleatorio
         first_index = 0 if origin_rl == 0 else randint(0,origin_rl)
         second_index = 0 if dest_rl == 0 else randint(0,dest_rl)
 
-        new_origin_route, new_dest_route = sequence_exchange(origin_route['stops'], dest_route['stops'], first_index, second_index, sequence_length)
-        valid_route = validate_route(new_origin_route, capacity, coord_map) and validate_route(new_dest_route, capacity, coord_map) 
+        # El intercambio se evalua con las sumas acumuladas de las rutas, y solo se
+        # construyen las nuevas rutas si es valido
+        origin_prefix = new_solution.prefix(origin_route_index, instance)
+        dest_prefix = new_solution.prefix(dest_route_index, instance)
+        origin_load, dest_load = sequence_exchange_load(origin_prefix, dest_prefix, first_index, second_index, sequence_length)
+        if new_solution.load_capacity is not None and (origin_load > new_solution.load_slack(origin_route_index)
+                                                       or dest_load > new_solution.load_slack(dest_route_index)):
+            continue
+
+        origin_change, dest_change = sequence_exchange_delta(origin_prefix, dest_prefix, first_index, second_index, sequence_length, instance)
+        valid_route = (new_solution.lengths[origin_route_index] + origin_change < capacity
+                       and new_solution.lengths[dest_route_index] + dest_change < capacity)
 
         if valid_route:
-            origin_route['stops'], dest_route['stops'] = new_origin_route, new_dest_route
-        
-    return new_routes
+            new_origin_route, new_dest_route = sequence_exchange(origin_route, dest_route, first_index, second_index, sequence_length)
+            new_solution.update_route(origin_route_index, new_origin_route, origin_change, origin_load)
+            new_solution.update_route(dest_route_index, new_dest_route, dest_change, dest_load)
+
+    if stats is not None:
+        stats.record_shake(f'SE{sequence_length}', attempts, valid_route)
 
-def SE2(routes, coord_map, capacity):
+    return new_solution
+
+def SE2(solution, instance, capacity, stats=None):
     '''
     Wrapper de SE_MOVEMENT con una secuencia de dos
     Usado para tener un formato de movimiento comun en Shake
 
     Parameters
     ----------
-        routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
-        
+
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
+
     Returns
     -------
-        new_routes: dict
-            Diccionario con las rutas que hace cada camion despues de intercambiar la secuencia
+        new_solution: Solution
+            Rutas que hace cada camion despues de intercambiar la secuencia
 
     '''
-    return SE_MOVEMENT(routes, coord_map, capacity, 2)
+    return SE_MOVEMENT(solution, instance, capacity, 2, stats)
 
-def SE3(routes, coord_map, capacity):
+def SE3(solution, instance, capacity, stats=None):
     '''
     Wrapper de SE_MOVEMENT con una secuencia de tres
     Usado para tener un formato de movimiento comun en Shake
 
     Parameters
     ----------
-        routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
-        
+
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
+
     Returns
     -------
-        new_routes: dict
-            Diccionario con las rutas que hace cada camion despues de intercambiar la secuencia
+        new_solution: Solution
+            Rutas que hace cada camion despues de intercambiar la secuencia
 
     '''
-    return SE_MOVEMENT(routes, coord_map, capacity, 3)
+    return SE_MOVEMENT(solution, instance, capacity, 3, stats)
 
 
-def shake(routes, coord_map, capacity, k):
+def shake(solution, instance, capacity, k, stats=None, sequence_lengths=(2, 3)):
     '''
     Genera un nuevo conjunto de rutas aleatorio en un vecindario
-    Existen 6 vecindarios, determinados por las tres funciones
-    MC2, SE2 y SE3, que se pueden ejecutar una o dos veces. 
+    Por defecto existen 6 vecindarios, determinados por las tres funciones
+    MC2, SE2 y SE3, que se pueden ejecutar una o dos veces. Cada longitud
+    de sequence_lengths anade un intercambio de secuencias de esa longitud
 
     Parameters
     ----------
-        routes: dict
-            Diccionario con las rutas que hace cada camion, y el camion que las realiza
+        solution: Solution
+            Rutas que hace cada camion junto con sus longitudes
 
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
-        
+
         k: int
             Numero de cambios de vecindario a realizar
-        
+
+        stats: Stats
+            Contadores de la ejecucion, o None para no registrarlos
+
+        sequence_lengths: tuple
+            Longitudes de los intercambios de secuencias del shake, ademas de MC2
+
     Returns
     -------
-        new_routes: dict
-            Diccionario con las rutas que hace cada camion despues de cambiar de vecindario
+        new_solution: Solution
+            Rutas que hace cada camion despues de cambiar de vecindario
 
     '''
-    new_routes = deepcopy(routes)
-    neighbours = [MC2, SE2, SE3]
+    new_solution = solution
 
     for i in range(0,k):
-        neighbour = randint(0,len(neighbours)-1)
+        neighbour = randint(0,len(sequence_lengths))
         movements = randint(1,2)
         for j in range(0,movements):
-            new_routes = neighbours[neighbour](routes, coord_map, capacity)
+            if neighbour == 0:
+                new_solution = MC2(solution, instance, capacity, stats)
+            else:
+                new_solution = SE_MOVEMENT(solution, instance, capacity, sequence_lengths[neighbour - 1], stats)
+
+    return new_solution
+
 
-    return new_routes
 
 
+def check_stops(instance, capacity, load_capacity=None):
+    '''
+    Comprueba que cada parada se puede servir en una ruta con solo esa parada
+
+    Parameters
+    ----------
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Distancia maxima que recorren los camiones
 
+        load_capacity: int
+            Carga maxima de cada camion, o None si no se tienen en cuenta las demandas
 
-def build_routes(coord_map, trucks):
+    Raises
+    ------
+        ValueError
+            Si la ida y vuelta desde el deposito a una parada no es menor que capacity,
+            o su demanda supera load_capacity
+    '''
+    dist = instance.distances
+    demands = instance.stop_demands
+    for stop in range(DEPOT + 1, instance.dimension + 1):
+        if 2 * dist[DEPOT][stop] >= capacity:
+            raise ValueError(f'Stop {stop} is {dist[DEPOT][stop]} away from the depot, too far for capacity {capacity}')
+        if load_capacity is not None and demands[stop] > load_capacity:
+            raise ValueError(f'Stop {stop} has demand {demands[stop]}, more than the vehicle capacity {load_capacity}')
+
+def build_routes(instance, trucks, load_capacity=None):
     '''
     Metodo greedy para construir rutas dado un numero de camiones
     Genera una lista aleatoria con las paradas, y las asigna iterativamente
@@ -645,16 +4080,21 @@ def build_routes(coord_map, trucks):
 
     Parameters
     ----------
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         trucks: int
             Numero de camiones
+
+        load_capacity: int
+            Carga maxima de cada camion. Si se indica, cada parada solo se asigna a
+            los camiones en los que cabe su demanda
         
     Returns
     -------
         routes: dict
-            Diccionario con las rutas que hace cada camion
+            Diccionario con las rutas que hace cada camion, o None si alguna parada
+            no cabe en ningun camion
 
     '''
     routes = []
@@ -666,26 +4106,38 @@ def build_routes(coord_map, trucks):
         routes.append(route)
 
     # La primera parada es el deposito, asi que no se asigna a ningun camion
-    stop_list = [i for i in range(2, len(coord_map)+1)]
+    stop_list = [i for i in range(2, instance.dimension+1)]
     shuffle(stop_list)
 
+    dist = instance.distances
+    demands = instance.stop_demands
+    loads = [0] * trucks
+    # Longitud de cada ruta, para medir la ruta con la nueva parada al final sin recorrerla
+    lengths = [0] * trucks
     while stop_list:
         new_stop = stop_list.pop()
         min_length = inf
         next_route = {}
         for route in routes:
-            stops = route['stops'][:]
-            stops.append(new_stop)
-            rl = route_length(stops, coord_map)
+            index = route['truck'] - 1
+            if load_capacity is not None and loads[index] + demands[new_stop] > load_capacity:
+                continue
+            last = route['stops'][-1] if route['stops'] else DEPOT
+            rl = lengths[index] - dist[last][DEPOT] + dist[last][new_stop] + dist[new_stop][DEPOT]
             if rl < min_length:
                 min_length = rl
                 next_route = route
-        
+
+        if not next_route:
+            return None
+
         next_route['stops'].append(new_stop)
+        loads[next_route['truck'] - 1] += demands[new_stop]
+        lengths[next_route['truck'] - 1] = min_length
 
     return routes
 
-def build_initial_solution(coord_map, capacity):
+def build_initial_solution(instance, capacity, load_capacity=None):
     '''
     Metodo iterativo para construir una solucion inicial
     Incrementa el numero de camiones con el que se llama
@@ -693,35 +4145,296 @@ def build_initial_solution(coord_map, capacity):
 
     Parameters
     ----------
-        coord_map: dict
-            Diccionario con las coordenadas de cada parada
+        instance: Instance
+            Instancia del problema con la matriz de distancias
 
         capacity: int
             Capacidad maxima de los camiones
+
+        load_capacity: int
+            Carga maxima de cada camion, o None si no se tienen en cuenta las demandas
         
     Returns
     -------
         routes: dict
             Diccionario con las rutas que hace cada camion
 
+    Raises
+    ------
+        ValueError
+            Si alguna parada no se puede servir ni en una ruta para ella sola, en cuyo
+            caso ningun numero de camiones daria una solucion valida
+
     '''
+    check_stops(instance, capacity, load_capacity)
     valid_routes = False
     trucks = 0
     while not valid_routes:
         trucks += 1
-        routes = build_routes(coord_map, trucks)
-        valid_routes = True
-        for route in routes:
-            valid_routes = valid_routes and validate_route(route['stops'], capacity, coord_map)
+        routes = build_routes(instance, trucks, load_capacity)
+        valid_routes = routes is not None
+        for route in routes or []:
+            valid_routes = valid_routes and validate_route(route['stops'], capacity, instance, load_capacity)
 
     print(f"Starting with {trucks} trucks")
     return routes
 
+def savings_solution(instance, capacity, load_capacity=None):
+    '''
+    Heuristica de ahorros de Clarke y Wright para construir una solucion inicial en una
+    sola pasada. Cada parada empieza en su propia ruta y se unen pares de rutas por sus
+    extremos en orden de mayor a menor ahorro d(0, i) + d(0, j) - d(i, j), siempre que
+    la ruta resultante sea valida. La longitud y la carga de cada ruta se guardan, por
+    lo que cada union se comprueba en tiempo constante
+
+    Parameters
+    ----------
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Distancia maxima que recorren los camiones
+
+        load_capacity: int
+            Carga maxima de cada camion, o None si no se tienen en cuenta las demandas
+
+    Returns
+    -------
+        routes: list
+            Lista con las rutas que hace cada camion, y el camion que las realiza
+
+    Raises
+    ------
+        ValueError
+            Si alguna parada no se puede servir ni en una ruta para ella sola
 
-def general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose=0):
     '''
-    Metodo que ejecuta un VNS general sobre una instancia del problema VRP definido por
-    Augerat. 
+    check_stops(instance, capacity, load_capacity)
+    dist = instance.distances
+    demands = instance.stop_demands
+    customers = np.arange(DEPOT + 1, instance.dimension + 1)
+    depot_distances = np.asarray(instance.matrix[DEPOT, customers], dtype=np.float64)
+    savings = depot_distances[:, np.newaxis] + depot_distances[np.newaxis, :] - instance.matrix[np.ix_(customers, customers)]
+    first, second = np.triu_indices(len(customers), 1)
+    order = np.argsort(-savings[first, second], kind='stable')
+
+    # Cada ruta se identifica por la parada con la que se creo
+    route_of = {stop: stop for stop in customers.tolist()}
+    stops = {stop: [stop] for stop in route_of}
+    lengths = {stop: 2 * dist[DEPOT][stop] for stop in route_of}
+    loads = {stop: demands[stop] for stop in route_of}
+
+    for index in order.tolist():
+        u = int(customers[first[index]])
+        v = int(customers[second[index]])
+        u_route, v_route = route_of[u], route_of[v]
+        if u_route == v_route:
+            continue
+        u_stops, v_stops = stops[u_route], stops[v_route]
+        # Solo se pueden unir paradas que esten en un extremo de su ruta
+        if u_stops[0] != u and u_stops[-1] != u or v_stops[0] != v and v_stops[-1] != v:
+            continue
+
+        length = lengths[u_route] + lengths[v_route] - dist[DEPOT][u] - dist[DEPOT][v] + dist[u][v]
+        load = loads[u_route] + loads[v_route]
+        if length >= capacity or load_capacity is not None and load > load_capacity:
+            continue
+
+        # Las distancias son simetricas, asi que invertir una ruta no cambia su longitud
+        merged = (u_stops if u_stops[-1] == u else u_stops[::-1]) + (v_stops if v_stops[0] == v else v_stops[::-1])
+        for stop in v_stops:
+            route_of[stop] = u_route
+        stops[u_route] = merged
+        lengths[u_route] = length
+        loads[u_route] = load
+        del stops[v_route], lengths[v_route], loads[v_route]
+
+    routes = [{'truck': truck, 'stops': route} for truck, route in enumerate(stops.values(), start=1)]
+    print(f"Starting with {len(routes)} trucks")
+    return routes
+
+def sweep_solution(instance, capacity, load_capacity=None):
+    '''
+    Heuristica de barrido para construir una solucion inicial en una sola pasada
+    Las paradas se ordenan por su angulo alrededor del deposito, empezando en una
+    parada aleatoria, y se anaden al final de la ruta actual mientras sea valida;
+    si no, se empieza una ruta nueva. La longitud de la ruta con la nueva parada
+    se obtiene en tiempo constante a partir de la longitud actual
+
+    Parameters
+    ----------
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Distancia maxima que recorren los camiones
+
+        load_capacity: int
+            Carga maxima de cada camion, o None si no se tienen en cuenta las demandas
+
+    Returns
+    -------
+        routes: list
+            Lista con las rutas que hace cada camion, y el camion que las realiza
+
+    Raises
+    ------
+        ValueError
+            Si alguna parada no se puede servir ni en una ruta para ella sola
+
+    '''
+    check_stops(instance, capacity, load_capacity)
+    dist = instance.distances
+    demands = instance.stop_demands
+    customers = np.arange(DEPOT + 1, instance.dimension + 1)
+    offsets = instance.coords[customers] - instance.coords[DEPOT]
+    angles = np.arctan2(offsets[:, 1], offsets[:, 0])
+    ordered = customers[np.argsort(angles, kind='stable')].tolist()
+    start = randint(0, len(ordered) - 1)
+    ordered = ordered[start:] + ordered[:start]
+
+    routes = []
+    route, length, load, last = [], 0, 0, DEPOT
+    for stop in ordered:
+        new_length = length - dist[last][DEPOT] + dist[last][stop] + dist[stop][DEPOT]
+        new_load = load + demands[stop]
+        if route and (new_length >= capacity or load_capacity is not None and new_load > load_capacity):
+            routes.append(route)
+            route, length, load, last = [], 0, 0, DEPOT
+            new_length = 2 * dist[DEPOT][stop]
+            new_load = demands[stop]
+
+        route.append(stop)
+        length, load, last = new_length, new_load, stop
+
+    routes.append(route)
+    routes = [{'truck': truck, 'stops': stops} for truck, stops in enumerate(routes, start=1)]
+    print(f"Starting with {len(routes)} trucks")
+    return routes
+
+def best_insertion(stops, new_stop, instance):
+    '''
+    Busca la posicion de una ruta en la que insertar una parada alarga menos la ruta
+
+    Parameters
+    ----------
+        stops: list
+            Lista con las paradas de la ruta
+
+        new_stop: int
+            Parada a insertar
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (cost, position): tuple
+            Aumento de longitud de la ruta y posicion de la parada en la nueva ruta
+
+    '''
+    dist = instance.distances
+    to_stop = dist[new_stop]
+    best = (inf, 0)
+    previous = DEPOT
+    for position, stop in enumerate(stops + [DEPOT]):
+        cost = to_stop[previous] + to_stop[stop] - dist[previous][stop]
+        if cost < best[0]:
+            best = (cost, position)
+        previous = stop
+
+    return best
+
+def insertion_solution(instance, capacity, load_capacity=None):
+    '''
+    Heuristica de insercion mas barata para construir una solucion inicial en una sola
+    pasada. En cada paso se inserta, en cualquier posicion de cualquier ruta, la parada
+    cuya insercion valida alarga menos su ruta. Si ninguna parada cabe en las rutas
+    abiertas, se abre una ruta con la parada pendiente mas alejada del deposito
+
+    Las inserciones candidatas se guardan en un monticulo. Al cambiar una ruta solo se
+    recalculan las inserciones en esa ruta; las que quedan en el monticulo de versiones
+    anteriores de la ruta se descartan al sacarlas
+
+    Parameters
+    ----------
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Distancia maxima que recorren los camiones
+
+        load_capacity: int
+            Carga maxima de cada camion, o None si no se tienen en cuenta las demandas
+
+    Returns
+    -------
+        routes: list
+            Lista con las rutas que hace cada camion, y el camion que las realiza
+
+    Raises
+    ------
+        ValueError
+            Si alguna parada no se puede servir ni en una ruta para ella sola
+
+    '''
+    check_stops(instance, capacity, load_capacity)
+    dist = instance.distances
+    demands = instance.stop_demands
+    pending = set(range(DEPOT + 1, instance.dimension + 1))
+    routes, lengths, loads, versions = [], [], [], []
+    heap = []
+
+    def push_insertions(index):
+        # Inserciones validas de cada parada pendiente en la ruta que acaba de cambiar
+        for stop in pending:
+            if load_capacity is not None and loads[index] + demands[stop] > load_capacity:
+                continue
+            cost, position = best_insertion(routes[index], stop, instance)
+            if lengths[index] + cost < capacity:
+                heappush(heap, (cost, stop, index, versions[index], position))
+
+    while pending:
+        while heap:
+            cost, stop, index, version, position = heappop(heap)
+            if stop in pending and version == versions[index]:
+                break
+        else:
+            # Ninguna parada pendiente cabe en las rutas abiertas
+            stop = max(pending, key=lambda stop: (dist[DEPOT][stop], stop))
+            routes.append([])
+            lengths.append(0)
+            loads.append(0)
+            versions.append(0)
+            index, position, cost = len(routes) - 1, 0, 2 * dist[DEPOT][stop]
+
+        pending.remove(stop)
+        routes[index].insert(position, stop)
+        lengths[index] += cost
+        loads[index] += demands[stop]
+        versions[index] += 1
+        push_insertions(index)
+
+    routes = [{'truck': truck, 'stops': stops} for truck, stops in enumerate(routes, start=1)]
+    print(f"Starting with {len(routes)} trucks")
+    return routes
+
+# Metodos con los que general_VNS puede construir la solucion inicial
+CONSTRUCTORS = {
+    'greedy': build_initial_solution,
+    'savings': savings_solution,
+    'sweep': sweep_solution,
+    'insertion': insertion_solution,
+}
+
+
+def general_VNS_progress(path, k_max, capacity, inter_movements, intra_movements, verbose=0, granularity=None, strategy='first',
+                         dont_look=False, engine='python', time_budget=None, evaluation_budget=None, stats=None, storage=None,
+                         use_demands=False, shake_sequences=(2, 3), constructor='greedy'):
+    '''
+    Generador que ejecuta un VNS general sobre una instancia del problema VRP definido por
+    Augerat y devuelve un evento con la solucion inicial y otro cada vez que mejora la mejor
+    solucion. Si se deja de iterar sobre el generador, la busqueda termina
 
     Parameters
     ----------
@@ -732,7 +4445,7 @@ def general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose
             Numero maximo de cambios de vecindario que se pueden realizar
 
         capacity: int
-            Capacidad maxima de los camiones
+            Distancia maxima que recorren los camiones, o None para no limitarla
         
         inter_movements: list
             Lista con los moviminentos entre distintas rutas que puede realizar el VND
@@ -744,48 +4457,154 @@ def general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose
             Nivel de verbose del codigo. 0 muestra el resultado, 1 muestra algun paso 
             intermedio, 2 muestra todos los pasos intermedios
 
+        granularity: int
+            Numero de vecinos mas cercanos de cada parada que usa el VND para limitar
+            los movimientos entre rutas. Si es None se prueban todos los movimientos
+
+        strategy: string
+            Estrategia de busqueda local del VND: 'first', 'resume' o 'best'
+
+        dont_look: boolean
+            Si es True, el VND solo prueba movimientos entre rutas desde las paradas
+            de las rutas que han cambiado desde el ultimo optimo local
+
+        engine: string
+            Motor con el que el VND recorre los vecindarios: 'python', 'numpy' o 'jit'
+            'jit' compila los recorridos con Numba si esta instalado
+
+        time_budget: float
+            Segundos como maximo que dura la busqueda. Si es None no hay limite de tiempo
+
+        evaluation_budget: int
+            Numero maximo de movimientos que puede evaluar el VND. Si es None no hay limite
+            Al agotarse cualquiera de los dos limites se devuelve la mejor solucion encontrada
+
+        stats: Stats
+            Contadores donde se registran las evaluaciones, movimientos y tiempos de cada
+            movimiento, los intentos del shake y los VND de cada k. Si es None no se registran
+
+        storage: string
+            Si es None la matriz de distancias se carga en memoria. Con 'float64', 'float32'
+            o 'nint' se mapea en memoria con ese tipo y la comparten todos los procesos
+
+        use_demands: boolean
+            Si es True, la demanda de las paradas de cada ruta no puede superar el campo
+            CAPACITY de la instancia. Se comprueba junto con la distancia maxima
+
+        shake_sequences: tuple
+            Longitudes de las secuencias que intercambia el shake. Por defecto (2, 3),
+            que corresponde a SE2 y SE3
+
+        constructor: string
+            Metodo para construir la solucion inicial: 'greedy' prueba con 1, 2, 3...
+            camiones hasta que el reparto aleatorio es valido, 'savings' usa los ahorros
+            de Clarke y Wright, 'sweep' un barrido por angulo alrededor del deposito e
+            'insertion' la insercion mas barata en cualquier posicion de las rutas
+
         
     Returns
     -------
-        score: int
-            Puntuacion final de las rutas del algoritmo
+        event: dict
+            Diccionario con la iteracion (0 para la solucion inicial), el valor de k con el
+            que se ha mejorado, la puntuacion, los segundos transcurridos desde el inicio y
+            las rutas de la nueva mejor solucion
 
     '''
+    start = perf_counter()
     k = 1
-    coord_map = augerat_parser(path)
-    routes = build_initial_solution(coord_map, capacity)
-    score = routes_score(routes, coord_map)
-
-
-    while k < k_max:
-        new_routes = shake(routes, coord_map, capacity, k)
+    iteration = 0
+    budget = None if time_budget is None and evaluation_budget is None else Budget(time_budget, evaluation_budget)
+    instance = load_instance(path, storage)
+    capacity = inf if capacity is None else capacity
+    load_capacity = None
+    if use_demands:
+        if instance.vehicle_capacity is None:
+            raise ValueError(f'Instance {path} has no CAPACITY field')
+        load_capacity = instance.vehicle_capacity
+    neighbours = None if granularity is None else instance.nearest_neighbours(granularity)
+    solution = Solution(CONSTRUCTORS[constructor](instance, capacity, load_capacity), instance, load_capacity)
+    if dont_look:
+        solution.looking = set(range(DEPOT + 1, instance.dimension + 1))
+    score = solution.score
+    yield {'iteration': iteration, 'k': k, 'score': score, 'elapsed': perf_counter() - start, 'routes': solution.to_routes()}
+
+    while k < k_max and (budget is None or not budget.exhausted()):
+        iteration += 1
+        new_solution = shake(solution, instance, capacity, k, stats, shake_sequences)
         if verbose > 1:
-            print(f'Shake score: {routes_score(new_routes, coord_map)} for k: {k}')
-
-        new_routes = VND(new_routes, coord_map, capacity, inter_movements, intra_movements)
-        new_score = routes_score(new_routes, coord_map)
+            print(f'Shake score: {new_solution.score} for k: {k}')
+
+        if stats is not None:
+            descent_start = perf_counter()
+            moves = stats.moves
+        new_solution = VND(new_solution, instance, capacity, inter_movements, intra_movements, neighbours, strategy, engine, budget, stats)
+        if stats is not None:
+            stats.record_descent(k, stats.moves - moves, perf_counter() - descent_start)
+        new_score = new_solution.score
         if verbose > 1:
             print(f'VND score: {new_score}')
 
-        if new_score < score:
+        if new_score < score - IMPROVEMENT_EPSILON:
             if verbose > 0:
                 print(f'The score has improved by {score - new_score}')
                 print(f'Current score: {new_score}')
+            yield {'iteration': iteration, 'k': k, 'score': new_score, 'elapsed': perf_counter() - start, 'routes': new_solution.to_routes()}
             k = 1
-            routes = new_routes 
-            score = routes_score(routes, coord_map)
+            solution = new_solution 
+            score = solution.score
 
         else:
             k += 1
 
     if verbose > 0:
-        for route in routes:
-            print(f"Route {route['truck']} with score {route_length(route['stops'], coord_map)}")
+        for truck, length in zip(solution.trucks, solution.lengths):
+            print(f"Route {truck} with score {length}")
 
-    print(f"Best score: {score}")
-    return score
+def general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose=0, **options):
+    '''
+    Metodo que ejecuta un VNS general sobre una instancia del problema VRP definido por
+    Augerat. 
 
-def general_VNS_small(path, k_max, capacity, verbose=0):
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+        
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        capacity: int
+            Capacidad maxima de los camiones
+        
+        inter_movements: list
+            Lista con los moviminentos entre distintas rutas que puede realizar el VND
+
+        intra_movements: list
+            Lista con los movimientos dentro de la misma ruta que puede realizar el VND
+
+        verbose: int
+            Nivel de verbose del codigo. 0 muestra el resultado, 1 muestra algun paso 
+            intermedio, 2 muestra todos los pasos intermedios
+
+        options: dict
+            Parametros opcionales de general_VNS_progress: granularity, strategy, dont_look,
+            engine, time_budget, evaluation_budget, stats, storage, use_demands, shake_sequences
+            o constructor
+
+        
+    Returns
+    -------
+        (score, routes): tuple
+            Puntuacion final y rutas que hace cada camion en la mejor solucion encontrada
+
+    '''
+    for event in general_VNS_progress(path, k_max, capacity, inter_movements, intra_movements, verbose, **options):
+        best = event
+
+    print(f"Best score: {best['score']}")
+    return (best['score'], best['routes'])
+
+def general_VNS_small(path, k_max, capacity, verbose=0, **options):
     '''
     Wrapper que ejecuta un VNS general sobre una instancia del problema VRP definido por
     Augerat con dos movimientos para el VND. 
@@ -805,18 +4624,23 @@ def general_VNS_small(path, k_max, capacity, verbose=0):
             Nivel de verbose del codigo. 0 muestra el resultado, 1 muestra algun paso 
             intermedio, 2 muestra todos los pasos intermedios
 
+        options: dict
+            Parametros opcionales de general_VNS, como granularity, strategy, dont_look, engine,
+            time_budget, evaluation_budget, stats, storage, use_demands, shake_sequences
+            o constructor
+
         
     Returns
     -------
-        score: int
-            Puntuacion final de las rutas del algoritmo
+        (score, routes): tuple
+            Puntuacion final y rutas que hace cada camion en la mejor solucion encontrada
 
     '''
     inter_movements = [inter_swap]
     intra_movements = [intra_swap]
-    return general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose)
+    return general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose, **options)
 
-def general_VNS_mid(path, k_max, capacity, verbose=0):
+def general_VNS_mid(path, k_max, capacity, verbose=0, **options):
     '''
     Wrapper que ejecuta un VNS general sobre una instancia del problema VRP definido por
     Augerat con tres movimientos para el VND. 
@@ -836,19 +4660,24 @@ def general_VNS_mid(path, k_max, capacity, verbose=0):
             Nivel de verbose del codigo. 0 muestra el resultado, 1 muestra algun paso 
             intermedio, 2 muestra todos los pasos intermedios
 
+        options: dict
+            Parametros opcionales de general_VNS, como granularity, strategy, dont_look, engine,
+            time_budget, evaluation_budget, stats, storage, use_demands, shake_sequences
+            o constructor
+
         
     Returns
     -------
-        score: int
-            Puntuacion final de las rutas del algoritmo
+        (score, routes): tuple
+            Puntuacion final y rutas que hace cada camion en la mejor solucion encontrada
 
     '''
     inter_movements = [inter_swap, inter_shift]
     intra_movements = [intra_swap]
-    return general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose)
+    return general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose, **options)
 
 
-def general_VNS_big(path, k_max, capacity, verbose=0):
+def general_VNS_big(path, k_max, capacity, verbose=0, **options):
     '''
     Wrapper que ejecuta un VNS general sobre una instancia del problema VRP definido por
     Augerat con cuatro movimientos para el VND. 
@@ -868,13 +4697,18 @@ def general_VNS_big(path, k_max, capacity, verbose=0):
             Nivel de verbose del codigo. 0 muestra el resultado, 1 muestra algun paso 
             intermedio, 2 muestra todos los pasos intermedios
 
+        options: dict
+            Parametros opcionales de general_VNS, como granularity, strategy, dont_look, engine,
+            time_budget, evaluation_budget, stats, storage, use_demands, shake_sequences
+            o constructor
+
         
     Returns
     -------
-        score: int
-            Puntuacion final de las rutas del algoritmo
+        (score, routes): tuple
+            Puntuacion final y rutas que hace cada camion en la mejor solucion encontrada
 
     '''
     inter_movements = [inter_swap, inter_shift]
     intra_movements = [intra_swap, intra_shift]
-    return general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose)
\ No newline at end of file
+    return general_VNS(path, k_max, capacity, inter_movements, intra_movements, verbose, **options)
\ No newline at end of file
@@ -1,14 +1,372 @@
-from vns_cvrp import general_VNS_small, general_VNS_big, general_VNS_mid
+from vns_cvrp import general_VNS_small, general_VNS_big, general_VNS_mid, Stats
+from vns_population import population_variant
 from random import seed
 from statistics import mean, median
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os.path import basename, isfile
 from sys import argv
 
+# Fichero donde se guarda el resultado de cada ejecucion para poder reanudar los experimentos
+RESULTS_STORE = './results/samples.csv'
 
-def run_experiment(function, path, k_max, max_length, samples):
+# Fichero donde se guarda la clave de cada linea de resultados agregados ya escrita
+RESULTS_INDEX = './results/results_index.csv'
+
+
+def run_sample(function, path, k_max, max_length, sample, storage=None):
+    '''
+    Funcion que ejecuta un tipo de VNS sobre un fichero con una semilla concreta
+    Al fijar la semilla dentro de la propia ejecucion, el resultado es el mismo
+    independientemente del proceso en el que se ejecute
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se va a ejecutar
+
+        path: string
+            Ruta completa donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        max_length: int
+            Distancia maxima que recorren los camiones
+
+        sample: int
+            Numero de la ejecucion, usado como semilla
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None para cargarla en memoria
+
+    Returns
+    -------
+        score: float
+            Puntuacion final de las rutas del algoritmo
+    '''
+    print(f'Experiment {sample}')
+    seed(sample)
+    score, routes = function(path, k_max, max_length, verbose=0, storage=storage)
+    return score
+
+
+def run_stats_sample(function, path, k_max, max_length, sample):
+    '''
+    Funcion que ejecuta un tipo de VNS sobre un fichero con una semilla concreta
+    registrando sus contadores, y los guarda junto a los resultados de la instancia
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se va a ejecutar
+
+        path: string
+            Nombre del fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        max_length: int
+            Distancia maxima que recorren los camiones
+
+        sample: int
+            Numero de la ejecucion, usado como semilla
+
+    Returns
+    -------
+        stats: Stats
+            Contadores de la ejecucion
+    '''
+    folder = './instances'
+    print(f'Filename: {path}, VNS: {function.__name__}, stats for experiment {sample}')
+    stats = Stats()
+    seed(sample)
+    function(f'{folder}/{path}', k_max, max_length, verbose=0, stats=stats)
+    write_stats(function, path, sample, stats)
+    return stats
+
+
+def write_stats(function, path, sample, stats):
+    '''
+    Funcion que guarda los contadores de una ejecucion en el fichero de
+    estadisticas de la instancia, una fila por contador
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se ha ejecutado
+
+        path: string
+            Nombre del fichero de la instancia
+
+        sample: int
+            Numero de la ejecucion, usado como semilla
+
+        stats: Stats
+            Contadores de la ejecucion
+    '''
+    filename = f'./results/{path.split(".")[0]}_stats.csv'
+    new_file = not isfile(filename)
+    with open(filename, 'a') as file:
+        if new_file:
+            file.write('method;problem;seed;section;key;metric;value\n')
+        for row in stats.rows():
+            file.write(';'.join((function.__name__, path, str(sample)) + row) + '\n')
+
+
+def method_name(function, storage=None):
+    '''
+    Funcion que construye el nombre con el que se guardan los resultados de un tipo de VNS
+    Si la matriz de distancias se guarda con otro tipo, este se anade al nombre de la funcion
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se ejecuta
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None si se carga en memoria
+
+    Returns
+    -------
+        method: string
+            Nombre de la funcion, con el sufijo @storage si storage no es None
+    '''
+    return function.__name__ if storage is None else f'{function.__name__}@{storage}'
+
+
+def sample_key(function, path, k_max, max_length, sample, storage=None):
+    '''
+    Funcion que construye la clave que identifica una ejecucion en el almacen de resultados
+    Incluye los parametros del experimento para no mezclar resultados de configuraciones distintas
+    El metodo se nombra con method_name
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se ejecuta
+
+        path: string
+            Nombre del fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        max_length: int
+            Distancia maxima que recorren los camiones
+
+        sample: int
+            Numero de la ejecucion, usado como semilla
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None si se carga en memoria
+
+    Returns
+    -------
+        key: tuple
+            Tupla de cadenas (metodo, problema, k_max, distancia maxima, semilla)
+    '''
+    return (method_name(function, storage), basename(path), str(k_max), str(max_length), str(sample))
+
+
+def load_samples(store):
+    '''
+    Funcion que lee las ejecuciones ya terminadas del almacen de resultados
+    Si la ultima linea quedo a medias por una interrupcion, se descarta y se
+    termina con un salto de linea para que las nuevas lineas queden separadas
+
+    Parameters
+    ----------
+        store: string
+            Fichero donde se guarda el resultado de cada ejecucion
+
+    Returns
+    -------
+        finished: dict
+            Diccionario con la puntuacion de cada ejecucion, indexado por su clave
+    '''
+    finished = {}
+    if not isfile(store):
+        return finished
+
+    with open(store) as file:
+        lines = file.read().split('\n')
+
+    # Tras el ultimo salto de linea solo puede quedar una linea incompleta
+    if lines[-1]:
+        with open(store, 'a') as file:
+            file.write('\n')
+
+    for line in lines[:-1]:
+        fields = line.split(';')
+        if len(fields) == 6:
+            finished[tuple(fields[:5])] = float(fields[5])
+
+    return finished
+
+
+def record_sample(store, key, score):
+    '''
+    Funcion que escribe el resultado de una ejecucion al almacen de resultados
+    El fichero solo se amplia, nunca se reescribe
+
+    Parameters
+    ----------
+        store: string
+            Fichero donde se guarda el resultado de cada ejecucion
+
+        key: tuple
+            Clave de la ejecucion, generada con sample_key
+
+        score: float
+            Puntuacion final de la ejecucion
+    '''
+    with open(store, 'a') as file:
+        file.write(';'.join(key + (repr(score),)) + '\n')
+
+
+def results_file(path):
+    '''
+    Funcion que devuelve el fichero donde se guardan los resultados agregados de una instancia
+
+    Parameters
+    ----------
+        path: string
+            Nombre del fichero de la instancia
+
+    Returns
+    -------
+        file: string
+            Ruta del fichero de resultados de la instancia
+    '''
+    return f'./results/{path.split(".")[0]}_results.csv'
+
+
+def results_key(function, path, k_max, max_length, samples, storage=None):
+    '''
+    Funcion que construye la clave que identifica una linea de resultados agregados
+    Usa los mismos parametros que sample_key, con el numero de ejecuciones en lugar de la semilla
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se ejecuta
+
+        path: string
+            Nombre del fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        max_length: int
+            Distancia maxima que recorren los camiones
+
+        samples: int
+            Numero de veces que se ejecuta el algoritmo
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None si se carga en memoria
+
+    Returns
+    -------
+        key: tuple
+            Tupla de cadenas (metodo, problema, k_max, distancia maxima, numero de ejecuciones)
+    '''
+    return sample_key(function, path, k_max, max_length, samples, storage)
+
+
+def results_recorded(key, index=RESULTS_INDEX):
+    '''
+    Funcion que comprueba si la linea de resultados de una configuracion ya se escribio
+
+    Parameters
+    ----------
+        key: tuple
+            Clave de la linea de resultados, generada con results_key
+
+        index: string
+            Fichero donde se guarda la clave de cada linea de resultados escrita
+
+    Returns
+    -------
+        written: boolean
+            True si la linea ya se escribio
+    '''
+    if not isfile(index):
+        return False
+
+    with open(index) as file:
+        return any(tuple(line.rstrip('\n').split(';')) == key for line in file)
+
+
+def write_results(function, path, results, key=None, index=RESULTS_INDEX, storage=None):
+    '''
+    Funcion que muestra y guarda la media, la mediana y el mejor resultado
+    de las ejecuciones de un tipo de VNS sobre un fichero
+    Si se da la clave de la linea, se anota en el indice para no volver a escribirla
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se ha ejecutado
+
+        path: string
+            Nombre del fichero de la instancia
+
+        results: list
+            Puntuaciones obtenidas en cada ejecucion, ordenadas por semilla
+
+        key: tuple
+            Clave de la linea de resultados, generada con results_key
+
+        index: string
+            Fichero donde se guarda la clave de cada linea de resultados escrita
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None si se carga en memoria
+    '''
+    print(f'Mean: {mean(results)}, median: {median(results)}, best: {min(results)}')
+    with(open(results_file(path), 'a+')) as file:
+        file.write(results_row(function, path, results, storage))
+    if key is not None:
+        with open(index, 'a') as file:
+            file.write(';'.join(key) + '\n')
+
+
+def results_row(function, path, results, storage=None):
+    '''
+    Funcion que construye la linea de resultados de un tipo de VNS sobre un fichero
+    El metodo se nombra con method_name, igual que en las claves del almacen de resultados
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se ha ejecutado
+
+        path: string
+            Nombre del fichero de la instancia
+
+        results: list
+            Puntuaciones obtenidas en cada ejecucion, ordenadas por semilla
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None si se carga en memoria
+
+    Returns
+    -------
+        row: string
+            Linea con el metodo, el problema, la media, la mediana y el mejor resultado
+    '''
+    return ';'.join([method_name(function, storage), path, str(mean(results)), str(median(results)), str(min(results)), '\n'])
+
+
+def run_experiment(function, path, k_max, max_length, samples, store=RESULTS_STORE, storage=None, index=RESULTS_INDEX):
     '''
     Funcion que ejecuta un tipo de VNS sobre un fichero cambiando la semilla
     un determinado numero de veces
+    Cada ejecucion se guarda en el almacen de resultados al terminar, y las que
+    ya estan guardadas de una ejecucion anterior no se repiten
 
     Parameters
     ----------
@@ -17,7 +375,7 @@ def run_experiment(function, path, k_max, max_length, samples):
 
         path: string
             Ruta donde se encuentra el fichero de la instancia
-        
+
         k_max: int
             Numero maximo de cambios de vecindario que se pueden realizar
 
@@ -26,20 +384,139 @@ def run_experiment(function, path, k_max, max_length, samples):
 
         samples: int
             Numero de veces que se va a ejecutar el algoritmo
+
+        store: string
+            Fichero donde se guarda el resultado de cada ejecucion
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None para cargarla en memoria
+
+        index: string
+            Fichero donde se guarda la clave de cada linea de resultados escrita
     '''
     results = []
     folder = './instances'
+    finished = load_samples(store)
     print(f'Filename: {path}, VNS: {function.__name__}, timestamp: {datetime.now().strftime("%H:%M:%S")}')
     for i in range(0,samples):
-        print(f'Experiment {i}')
-        seed(i)
-        results.append(function(f'{folder}/{path}', k_max, max_length, verbose=0))
+        key = sample_key(function, path, k_max, max_length, i, storage)
+        if key not in finished:
+            finished[key] = run_sample(function, f'{folder}/{path}', k_max, max_length, i, storage)
+            record_sample(store, key, finished[key])
+        results.append(finished[key])
 
-    print(f'Mean: {mean(results)}, median: {median(results)}, best: {min(results)}')
-    with(open(f'./results/{path.split(".")[0]}_results.csv', 'a+')) as file:
-        file.write(';'.join([function.__name__, path, str(mean(results)), str(median(results)), str(min(results)), '\n']))
+    # La linea se escribe aunque todas las semillas estuvieran ya terminadas, salvo que ya
+    # se escribiera para la misma configuracion
+    key = results_key(function, path, k_max, max_length, samples, storage)
+    if not results_recorded(key, index):
+        write_results(function, path, results, key, index, storage)
+
+
+def run_parallel_experiments(functions, path, k_max, max_length, samples, workers, store=RESULTS_STORE, storage=None, index=RESULTS_INDEX):
+    '''
+    Funcion que ejecuta varios tipos de VNS sobre un fichero cambiando la semilla,
+    repartiendo cada par (VNS, semilla) entre un conjunto de procesos
+    Los resultados que se guardan son los mismos que con run_experiment
+    Con storage todos los procesos mapean el mismo fichero de la matriz de distancias
+    en lugar de tener cada uno su propia copia
+
+    Parameters
+    ----------
+        functions: list
+            Funciones VNS que se van a ejecutar
+
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        max_length: int
+            Distancia maxima que recorren los camiones
+
+        samples: int
+            Numero de veces que se va a ejecutar cada algoritmo
+
+        workers: int
+            Numero de procesos que ejecutan los experimentos
+
+        store: string
+            Fichero donde se guarda el resultado de cada ejecucion
+
+        storage: string
+            Tipo de la matriz de distancias mapeada en memoria, o None para cargarla en memoria
+
+        index: string
+            Fichero donde se guarda la clave de cada linea de resultados escrita
+    '''
+    folder = './instances'
+    finished = load_samples(store)
+    print(f'Filename: {path}, VNS: {", ".join(function.__name__ for function in functions)}, workers: {workers}, timestamp: {datetime.now().strftime("%H:%M:%S")}')
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for function in functions:
+            for i in range(0, samples):
+                key = sample_key(function, path, k_max, max_length, i, storage)
+                if key not in finished:
+                    futures[pool.submit(run_sample, function, f'{folder}/{path}', k_max, max_length, i, storage)] = key
+
+        for future in as_completed(futures):
+            finished[futures[future]] = future.result()
+            record_sample(store, futures[future], finished[futures[future]])
+
+    for function in functions:
+        key = results_key(function, path, k_max, max_length, samples, storage)
+        if not results_recorded(key, index):
+            results = [finished[sample_key(function, path, k_max, max_length, i, storage)] for i in range(0, samples)]
+            print(f'Filename: {path}, VNS: {function.__name__}, timestamp: {datetime.now().strftime("%H:%M:%S")}')
+            write_results(function, path, results, key, index, storage)
+
+def run_population_experiment(function, path, k_max, max_length, samples, store=RESULTS_STORE, index=RESULTS_INDEX):
+    '''
+    Funcion que ejecuta un tipo de VNS sobre un fichero con todas las semillas a la vez,
+    avanzando todas las trayectorias en paralelo con population_VNS
+    Las puntuaciones de cada semilla y los resultados que se guardan son los mismos
+    que con run_experiment
+
+    Parameters
+    ----------
+        function: funcion
+            Funcion VNS que se va a ejecutar
+
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        max_length: int
+            Distancia maxima que recorren los camiones
+
+        samples: int
+            Numero de veces que se va a ejecutar el algoritmo
+
+        store: string
+            Fichero donde se guarda el resultado de cada ejecucion
+
+        index: string
+            Fichero donde se guarda la clave de cada linea de resultados escrita
+    '''
+    folder = './instances'
+    finished = load_samples(store)
+    print(f'Filename: {path}, VNS: {function.__name__}, population, timestamp: {datetime.now().strftime("%H:%M:%S")}')
+    pending = [i for i in range(0, samples) if sample_key(function, path, k_max, max_length, i) not in finished]
+    if pending:
+        scores = population_variant(function, f'{folder}/{path}', k_max, max_length, pending)
+        for i, score in zip(pending, scores):
+            key = sample_key(function, path, k_max, max_length, i)
+            finished[key] = score
+            record_sample(store, key, score)
 
+    key = results_key(function, path, k_max, max_length, samples)
+    if results_recorded(key, index):
+        return
 
+    write_results(function, path, [finished[sample_key(function, path, k_max, max_length, i)] for i in range(0, samples)], key, index)
 
 
 k_max = 50
@@ -48,9 +525,26 @@ samples = 30
 mypath = './instances'
 vns_variants = [general_VNS_small, general_VNS_mid, general_VNS_big]
 
-if argv[1]:
-    file = argv[1].split('\\')[2]
-    for vns in vns_variants:
-        run_experiment(vns, file, k_max, max_distance, samples)
-else:
-    print('No arguments were given')
\ No newline at end of file
+if __name__ == '__main__':
+    if len(argv) > 1:
+        file = basename(argv[1].replace('\\', '/'))
+        # El segundo argumento opcional es el numero de procesos a usar, population
+        # para ejecutar todas las semillas de cada VNS a la vez en un solo proceso,
+        # o stats para registrar los contadores de una ejecucion de cada VNS
+        # Si se da el numero de procesos, el tercero es el tipo de la matriz de distancias mapeada en memoria
+        mode = argv[2] if len(argv) > 2 and argv[2] in ('population', 'stats') else None
+        workers = int(argv[2]) if len(argv) > 2 and mode is None else 1
+        storage = argv[3] if len(argv) > 3 and mode is None else None
+        if mode == 'stats':
+            for vns in vns_variants:
+                run_stats_sample(vns, file, k_max, max_distance, int(argv[3]) if len(argv) > 3 else 0)
+        elif mode == 'population':
+            for vns in vns_variants:
+                run_population_experiment(vns, file, k_max, max_distance, samples)
+        elif workers > 1:
+            run_parallel_experiments(vns_variants, file, k_max, max_distance, samples, workers, storage=storage)
+        else:
+            for vns in vns_variants:
+                run_experiment(vns, file, k_max, max_distance, samples, storage=storage)
+    else:
+        print('No arguments were given')
@@ -0,0 +1,498 @@
+import random
+import numpy as np
+from vns_cvrp import load_instance, Solution, build_initial_solution, shake, apply_move, DEPOT, IMPROVEMENT_EPSILON, \
+    intra_swap, intra_shift, inter_swap, inter_shift, general_VNS_small, general_VNS_mid, general_VNS_big
+
+# Movimientos del VND de cada variante de general_VNS, en el orden en que las crean los wrappers
+VARIANT_MOVEMENTS = {
+    general_VNS_small: ([inter_swap], [intra_swap]),
+    general_VNS_mid: ([inter_swap, inter_shift], [intra_swap]),
+    general_VNS_big: ([inter_swap, inter_shift], [intra_swap, intra_shift]),
+}
+
+
+class Trajectory:
+    '''
+    Estado de una de las trayectorias VNS que avanzan a la vez en population_VNS
+
+    Attributes
+    ----------
+        seed: int
+            Semilla de la trayectoria
+
+        rng_state: tuple
+            Estado del generador aleatorio de la trayectoria entre pasos
+
+        solution: Solution
+            Mejor solucion encontrada hasta el momento
+
+        current: Solution
+            Solucion sobre la que se esta realizando el VND
+
+        k: int
+            Numero de cambios de vecindario del siguiente shake
+
+        inter_movements: list
+            Movimientos entre rutas de la trayectoria, en el orden del paso actual
+
+        intra_movements: list
+            Movimientos dentro de una ruta de la trayectoria, en el orden del paso actual
+
+        evaluated: tuple
+            Listas de paradas de cada ruta en la ultima evaluacion de sus vecindarios
+
+        moves: dict
+            Primer movimiento que mejora en cada unidad de busqueda que tiene alguno
+
+    '''
+    __slots__ = ('seed', 'rng_state', 'solution', 'current', 'k', 'inter_movements', 'intra_movements', 'evaluated', 'moves')
+
+
+def padded_routes(routes):
+    '''
+    Empaqueta varias rutas en un array, empezando cada una en el deposito y
+    rellenando con el deposito hasta la longitud de la ruta mas larga, de modo
+    que la parada i de una ruta tiene a su anterior en la posicion i y a su
+    siguiente en la posicion i+2
+
+    Parameters
+    ----------
+        routes: list
+            Listas de paradas a empaquetar
+
+    Returns
+    -------
+        (padded, sizes): tuple
+            Array de paradas (U, L+2) y numero de paradas de cada ruta (U,)
+
+    '''
+    sizes = np.array([len(stops) for stops in routes])
+    padded = np.full((len(routes), sizes.max() + 2), DEPOT)
+    for n, stops in enumerate(routes):
+        padded[n, 1:len(stops) + 1] = stops
+
+    return (padded, sizes)
+
+
+def intra_deltas(movement, padded, instance):
+    '''
+    Calcula la variacion de un movimiento dentro de una ruta para varias rutas
+    y cada par de indices, con las mismas operaciones que su funcion delta
+
+    Parameters
+    ----------
+        movement: funcion
+            intra_swap o intra_shift
+
+        padded: numpy.ndarray
+            Rutas empaquetadas por padded_routes
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        change: numpy.ndarray
+            Array (U, L, L) con la variacion del movimiento (i, j) en cada ruta
+
+    '''
+    dist = instance.matrix
+    index = np.arange(padded.shape[1] - 2)
+
+    if movement is intra_swap:
+        first = np.minimum(index[:, np.newaxis], index[np.newaxis, :])
+        second = np.maximum(index[:, np.newaxis], index[np.newaxis, :])
+        u, prev_u, next_u = padded[:, first + 1], padded[:, first], padded[:, first + 2]
+        v, prev_v, next_v = padded[:, second + 1], padded[:, second], padded[:, second + 2]
+
+        general = (dist[prev_u, v] + dist[v, next_u] + dist[prev_v, u] + dist[u, next_v]
+                   - dist[prev_u, u] - dist[u, next_u] - dist[prev_v, v] - dist[v, next_v])
+        adjacent = (dist[prev_u, v] + dist[v, u] + dist[u, next_v]
+                    - dist[prev_u, u] - dist[u, v] - dist[v, next_v])
+        return np.where(second == first + 1, adjacent, general)
+
+    elem_index = np.broadcast_to(index[:, np.newaxis], (len(index), len(index)))
+    shift_index = elem_index.T
+    moved, prev_moved, next_moved = padded[:, shift_index + 1], padded[:, shift_index], padded[:, shift_index + 2]
+    # Si se desplaza hacia delante la parada queda antes de route[elem_index], si no queda despues
+    before = np.where(elem_index < shift_index, padded[:, elem_index], padded[:, elem_index + 1])
+    after = np.where(elem_index < shift_index, padded[:, elem_index + 1], padded[:, elem_index + 2])
+
+    return (dist[prev_moved, next_moved] + dist[before, moved] + dist[moved, after]
+            - dist[prev_moved, moved] - dist[moved, next_moved] - dist[before, after])
+
+
+def inter_deltas(movement, first_padded, second_padded, instance):
+    '''
+    Calcula la variacion de un movimiento entre rutas para varios pares de rutas
+    y cada par de indices, con las mismas operaciones que su funcion delta
+
+    Parameters
+    ----------
+        movement: funcion
+            inter_swap o inter_shift
+
+        first_padded: numpy.ndarray
+            Primeras rutas de cada par, empaquetadas por padded_routes
+
+        second_padded: numpy.ndarray
+            Segundas rutas de cada par, empaquetadas por padded_routes
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+    Returns
+    -------
+        (first_change, second_change): tuple
+            Arrays (U, L1, L2) con la variacion de la primera y de la segunda
+            ruta de cada par para el movimiento (i, j)
+
+    '''
+    dist = instance.matrix
+    first_size = first_padded.shape[1] - 2
+    second_size = second_padded.shape[1] - 2
+    u = first_padded[:, 1:first_size + 1, np.newaxis]
+    prev_u = first_padded[:, 0:first_size, np.newaxis]
+    next_u = first_padded[:, 2:first_size + 2, np.newaxis]
+
+    if movement is inter_swap:
+        v = second_padded[:, np.newaxis, 1:second_size + 1]
+        prev_v = second_padded[:, np.newaxis, 0:second_size]
+        next_v = second_padded[:, np.newaxis, 2:second_size + 2]
+        first_change = dist[prev_u, v] + dist[v, next_u] - dist[prev_u, u] - dist[u, next_u]
+        second_change = dist[prev_v, u] + dist[u, next_v] - dist[prev_v, v] - dist[v, next_v]
+        return (first_change, second_change)
+
+    before = second_padded[:, np.newaxis, 0:second_size]
+    after = second_padded[:, np.newaxis, 1:second_size + 1]
+    first_change = dist[prev_u, next_u] - dist[prev_u, u] - dist[u, next_u]
+    second_change = dist[before, u] + dist[u, after] - dist[before, after]
+    return (np.broadcast_to(first_change, second_change.shape), second_change)
+
+
+def evaluate_units(movement, units, instance, capacity):
+    '''
+    Busca con una sola operacion vectorizada el primer movimiento que mejora en
+    varias unidades de busqueda de un mismo movimiento, que pueden ser de
+    trayectorias distintas, y lo guarda en las trayectorias
+
+    Parameters
+    ----------
+        movement: funcion
+            Movimiento de todas las unidades
+
+        units: list
+            Tuplas (trayectoria, indices de las rutas)
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+    '''
+    first_padded, first_sizes = padded_routes([trajectory.current.stops[routes[0]] for trajectory, routes in units])
+    first_lengths = np.array([trajectory.current.lengths[routes[0]] for trajectory, routes in units])
+    first_index = np.arange(first_padded.shape[1] - 2)
+
+    if movement in (intra_swap, intra_shift):
+        change = intra_deltas(movement, first_padded, instance)
+        first_change = second_change = None
+        sizes = first_sizes[:, np.newaxis, np.newaxis]
+        valid = ((change < -IMPROVEMENT_EPSILON) & (first_lengths[:, np.newaxis, np.newaxis] + change < capacity)
+                 & (first_index[:, np.newaxis] < sizes) & (first_index[np.newaxis, :] < sizes)
+                 & (first_index[:, np.newaxis] != first_index[np.newaxis, :]))
+    else:
+        second_padded, second_sizes = padded_routes([trajectory.current.stops[routes[1]] for trajectory, routes in units])
+        second_lengths = np.array([trajectory.current.lengths[routes[1]] for trajectory, routes in units])
+        second_index = np.arange(second_padded.shape[1] - 2)
+        first_change, second_change = inter_deltas(movement, first_padded, second_padded, instance)
+        change = first_change + second_change
+        valid = ((change < -IMPROVEMENT_EPSILON)
+                 & (first_lengths[:, np.newaxis, np.newaxis] + first_change < capacity)
+                 & (second_lengths[:, np.newaxis, np.newaxis] + second_change < capacity)
+                 & (first_index[:, np.newaxis] < first_sizes[:, np.newaxis, np.newaxis])
+                 & (second_index[np.newaxis, :] < second_sizes[:, np.newaxis, np.newaxis]))
+
+    # El primer indice plano valido es el primer (i, j) en el orden de permutations o product
+    columns = valid.shape[2]
+    flat = valid.reshape(len(units), -1)
+    first = flat.argmax(axis=1)
+
+    for n in np.nonzero(flat.any(axis=1))[0]:
+        trajectory, routes = units[n]
+        i, j = divmod(int(first[n]), columns)
+        if first_change is None:
+            trajectory.moves[(movement, routes)] = (float(change[n, i, j]), i, j)
+        else:
+            trajectory.moves[(movement, routes)] = (float(change[n, i, j]), float(first_change[n, i, j]),
+                                                    float(second_change[n, i, j]), i, j)
+
+
+def changed_units(trajectory):
+    '''
+    Obtiene las unidades de busqueda de una trayectoria que hay que volver a evaluar,
+    que son las que incluyen alguna ruta distinta a la de la ultima evaluacion, y
+    descarta los movimientos que tenian guardados
+
+    Parameters
+    ----------
+        trajectory: Trajectory
+            Trayectoria en fase de VND
+
+    Returns
+    -------
+        units: list
+            Unidades (movimiento, indices de las rutas) a evaluar, sin las que
+            tienen alguna ruta vacia, que no admiten ningun movimiento
+
+    '''
+    stops = trajectory.current.stops
+    changed = [index for index in range(0, len(stops))
+               if index >= len(trajectory.evaluated) or stops[index] is not trajectory.evaluated[index]]
+    trajectory.evaluated = tuple(stops)
+
+    units = [(movement, (index,)) for index in changed for movement in trajectory.intra_movements]
+    pairs = {(index, other) for index in changed for other in range(0, len(stops)) if other != index}
+    pairs.update((other, index) for index, other in list(pairs))
+    units.extend((movement, pair) for pair in pairs for movement in trajectory.inter_movements)
+
+    for unit in units:
+        trajectory.moves.pop(unit, None)
+
+    return [unit for unit in units if all(stops[index] for index in unit[1])]
+
+
+def scan_position(unit, size, inter_movements, intra_movements):
+    '''
+    Posicion de una unidad de busqueda en el orden de scan_units
+
+    Parameters
+    ----------
+        unit: tuple
+            Unidad (movimiento, indices de las rutas)
+
+        size: int
+            Numero de rutas de la solucion
+
+        inter_movements: list
+            Lista con los moviminentos entre distintas rutas en el orden del paso
+
+        intra_movements: list
+            Lista con los movimientos dentro de la misma ruta en el orden del paso
+
+    Returns
+    -------
+        position: int
+            Indice de la unidad en la lista de scan_units
+
+    '''
+    movement, routes = unit
+    if len(routes) == 1:
+        return routes[0] * len(intra_movements) + intra_movements.index(movement)
+
+    first, second = routes
+    pair = first * (size - 1) + second - (second > first)
+    return size * len(intra_movements) + pair * len(inter_movements) + inter_movements.index(movement)
+
+
+def batched_first_moves(trajectories, instance, capacity):
+    '''
+    Busca a la vez, para cada trayectoria, el mismo movimiento que encontraria
+    VND_movement: el primer movimiento que mejora en su orden de recorrido
+    Solo se vuelven a evaluar las unidades de busqueda cuyas rutas han cambiado
+    desde la ultima vez, agrupadas por movimiento entre todas las trayectorias
+
+    Parameters
+    ----------
+        trajectories: list
+            Trayectorias en fase de VND, con sus movimientos ya barajados para el paso
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+    Returns
+    -------
+        moves: list
+            Para cada trayectoria, una tupla (movimiento, indices de las rutas, movimiento
+            en el formato de apply_move), o None si ningun movimiento mejora
+
+    '''
+    pending = {}
+    for trajectory in trajectories:
+        for movement, routes in changed_units(trajectory):
+            pending.setdefault(movement, []).append((trajectory, routes))
+
+    for movement, units in pending.items():
+        evaluate_units(movement, units, instance, capacity)
+
+    moves = []
+    for trajectory in trajectories:
+        if not trajectory.moves:
+            moves.append(None)
+            continue
+        size = len(trajectory.current.stops)
+        unit = min(trajectory.moves, key=lambda unit: scan_position(unit, size, trajectory.inter_movements, trajectory.intra_movements))
+        moves.append(unit + (trajectory.moves[unit],))
+
+    return moves
+
+
+def start_step(trajectory):
+    '''
+    Baraja los movimientos de la trayectoria como al empezar cada VND_movement
+
+    Parameters
+    ----------
+        trajectory: Trajectory
+            Trayectoria que va a realizar un paso del VND
+    '''
+    random.setstate(trajectory.rng_state)
+    random.shuffle(trajectory.inter_movements)
+    random.shuffle(trajectory.intra_movements)
+    trajectory.rng_state = random.getstate()
+
+
+def start_descent(trajectory, instance, capacity):
+    '''
+    Realiza el shake de la trayectoria y prepara el primer paso de su VND
+
+    Parameters
+    ----------
+        trajectory: Trajectory
+            Trayectoria que empieza una nueva iteracion
+
+        instance: Instance
+            Instancia del problema con la matriz de distancias
+
+        capacity: int
+            Capacidad maxima de los camiones
+    '''
+    random.setstate(trajectory.rng_state)
+    trajectory.current = shake(trajectory.solution, instance, capacity, trajectory.k).copy()
+    trajectory.rng_state = random.getstate()
+    start_step(trajectory)
+
+
+def population_VNS(path, k_max, capacity, inter_movements, intra_movements, seeds):
+    '''
+    Ejecuta a la vez una trayectoria de general_VNS por cada semilla. El shake de cada
+    trayectoria se realiza por separado, con su propio estado del generador aleatorio,
+    y cada paso del VND de todas las trayectorias se evalua con una sola operacion
+    vectorizada sobre sus rutas empaquetadas y la matriz de distancias compartida
+    Cada trayectoria obtiene la misma puntuacion que general_VNS con su semilla y la
+    estrategia 'first', por lo que solo admite intra_swap, intra_shift, inter_swap e
+    inter_shift y el vecindario completo
+
+    Parameters
+    ----------
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        inter_movements: list
+            Lista con los moviminentos entre distintas rutas que puede realizar el VND
+
+        intra_movements: list
+            Lista con los movimientos dentro de la misma ruta que puede realizar el VND
+
+        seeds: list
+            Semillas de las trayectorias
+
+    Returns
+    -------
+        scores: list
+            Puntuacion final de cada trayectoria, en el orden de las semillas
+
+    '''
+    for movement in inter_movements + intra_movements:
+        if movement not in (intra_swap, intra_shift, inter_swap, inter_shift):
+            raise ValueError(f'{movement.__name__} is not supported in population mode')
+
+    instance = load_instance(path)
+    saved_state = random.getstate()
+    trajectories = []
+
+    for seed in seeds:
+        random.seed(seed)
+        trajectory = Trajectory()
+        trajectory.seed = seed
+        trajectory.solution = Solution(build_initial_solution(instance, capacity), instance)
+        trajectory.current = None
+        trajectory.k = 1
+        trajectory.inter_movements = inter_movements[:]
+        trajectory.intra_movements = intra_movements[:]
+        trajectory.evaluated = ()
+        trajectory.moves = {}
+        trajectory.rng_state = random.getstate()
+        trajectories.append(trajectory)
+
+    active = [trajectory for trajectory in trajectories if trajectory.k < k_max]
+    for trajectory in active:
+        start_descent(trajectory, instance, capacity)
+
+    while active:
+        moves = batched_first_moves(active, instance, capacity)
+        next_active = []
+        for trajectory, chosen in zip(active, moves):
+            if chosen is not None:
+                movement, routes, move = chosen
+                apply_move(trajectory.current, movement, routes, move, instance)
+                start_step(trajectory)
+                next_active.append(trajectory)
+                continue
+
+            # El VND ha llegado a un optimo local
+            if trajectory.current.score < trajectory.solution.score - IMPROVEMENT_EPSILON:
+                trajectory.k = 1
+                trajectory.solution = trajectory.current
+            else:
+                trajectory.k += 1
+
+            trajectory.current = None
+            if trajectory.k < k_max:
+                start_descent(trajectory, instance, capacity)
+                next_active.append(trajectory)
+
+        active = next_active
+
+    random.setstate(saved_state)
+    return [trajectory.solution.score for trajectory in trajectories]
+
+
+def population_variant(function, path, k_max, capacity, seeds):
+    '''
+    Ejecuta population_VNS con los movimientos de una de las variantes de general_VNS
+
+    Parameters
+    ----------
+        function: funcion
+            general_VNS_small, general_VNS_mid o general_VNS_big
+
+        path: string
+            Ruta donde se encuentra el fichero de la instancia
+
+        k_max: int
+            Numero maximo de cambios de vecindario que se pueden realizar
+
+        capacity: int
+            Capacidad maxima de los camiones
+
+        seeds: list
+            Semillas de las trayectorias
+
+    Returns
+    -------
+        scores: list
+            Puntuacion final de cada trayectoria, en el orden de las semillas
+
+    '''
+    inter_movements, intra_movements = VARIANT_MOVEMENTS[function]
+    return population_VNS(path, k_max, capacity, inter_movements[:], intra_movements[:], seeds)